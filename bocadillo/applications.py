@@ -2,7 +2,6 @@ import os
 from functools import partial
 from typing import (
     TYPE_CHECKING,
-    Any,
     Callable,
     Dict,
     List,
@@ -16,7 +15,6 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.wsgi import WSGIResponder
 from starlette.routing import Lifespan
 from starlette.testclient import TestClient
 from uvicorn.config import get_logger
@@ -29,18 +27,28 @@ from .app_types import (
     ASGIAppInstance,
     ErrorHandler,
     EventHandler,
+    HTTPApp,
     Receive,
     Scope,
     Send,
 )
+from .broadcast import Broadcast
 from .compat import WSGIApp
 from .constants import CONTENT_TYPE, DEFAULT_CORS_CONFIG
 from .deprecation import deprecated
 from .error_handlers import error_to_text
 from .errors import HTTPError, HTTPErrorMiddleware, ServerErrorMiddleware
+from .executors import (
+    Executor,
+    ProcessExecutor,
+    shutdown_default_process_executor,
+    start_default_process_executor,
+)
+from .json_engines import JSONEngine, get_json_engine
 from .media import UnsupportedMediaType, get_default_handlers
 from .meta import DocsMeta
-from .middleware import ASGIMiddleware
+from .middleware import ASGIMiddleware, compile_middleware
+from .mounts import MountTable
 from .request import Request
 from .response import Response
 from .routing import RoutingMixin
@@ -75,6 +83,10 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
     static_root (str):
         The path prefix for static assets.
         Defaults to `"static"`.
+    static_backend (str):
+        How static files are served: either `"whitenoise"` or `"asgi"`.
+        Defaults to `"whitenoise"`.
+        See also [Static files](../guides/http/static-files.md#static-files-backends).
     allowed_hosts (list of str, optional):
         A list of hosts which the server is allowed to run at.
         If the list contains `"*"`, any host is allowed.
@@ -100,16 +112,43 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         If specified, compress only responses that
         have more bytes than the specified value.
         Defaults to `1024`.
+    enable_etags (bool):
+        If `True`, compute an ETag for the content of responses and send
+        an empty `304 Not Modified` response when the client already has it.
+        Can be overridden for each route.
+        Defaults to `False`.
+        See also [Conditional responses](../guides/http/responses.md#conditional-responses).
     media_type (str):
         Determines how values given to `res.media` are serialized.
         Can be one of the supported media types.
         Defaults to `"application/json"`.
         See also [Media](../guides/http/media.md).
+    route_cache_size (int):
+        If positive, the HTTP and WebSocket routers keep the matched route
+        of up to this many URL paths in an LRU cache.
+        Defaults to `0` (no caching).
+        See also [Match cache](../guides/http/routing.md#match-cache).
+    json_engine (str or JSONEngine):
+        The engine used to serialize `res.media`, parse `await req.json()`
+        and exchange JSON messages over WebSockets.
+        Either a `JSONEngine` object, one of `"stdlib"`, `"orjson"`,
+        `"rapidjson"` or `"ujson"`, or `"auto"` to use the fastest
+        installed engine.
+        Defaults to `"stdlib"`.
+        See also [JSON engines](../guides/http/media.md#json-engines).
+    broadcast (Broadcast):
+        The hub used to publish messages to WebSockets subscribed to topics.
+        Defaults to an in-process hub.
+        See also [Broadcasting](../guides/websockets/broadcasting.md).
 
     # Attributes
     media_handlers (dict):
         The dictionary of media handlers.
         You can access, edit or replace this at will.
+    executors (dict):
+        The executors registered with [add_executor()](#add-executor)
+        and [add_process_executor()](#add-process-executor),
+        indexed by name.
     """
 
     def __init__(
@@ -118,17 +157,36 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         *,
         static_dir: Optional[str] = "static",
         static_root: Optional[str] = "static",
+        static_backend: str = "whitenoise",
         allowed_hosts: List[str] = None,
         enable_cors: bool = False,
         cors_config: dict = None,
         enable_hsts: bool = False,
         enable_gzip: bool = False,
         gzip_min_size: int = 1024,
+        enable_etags: bool = False,
         media_type: str = CONTENT_TYPE.JSON,
+        route_cache_size: int = 0,
+        json_engine: Union[str, JSONEngine] = "stdlib",
+        broadcast: Broadcast = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
 
+        # Routing
+        self.http_router.cache_size = route_cache_size
+        self.websocket_router.cache_size = route_cache_size
+
+        # JSON
+        self._json_engine = get_json_engine(json_engine)
+        self.websocket_router.json_engine = self._json_engine
+
+        # Broadcasting
+        if broadcast is None:
+            broadcast = Broadcast(json_engine=self._json_engine)
+        self.broadcast = broadcast
+        self.websocket_router.broadcast = broadcast
+
         self.name = name
 
         # Debug mode defaults to `False` but it can be set in `.run()`.
@@ -138,7 +196,7 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         self.asgi = self.dispatch
 
         # Mounted (children) apps
-        self._prefix_to_app: Dict[str, Any] = {}
+        self._mounts = MountTable()
         self._name_to_prefix_and_app: Dict[str, Tuple[str, App]] = {}
 
         # Test client
@@ -148,14 +206,21 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         if static_dir is not None:
             if static_root is None:
                 static_root = static_dir
-            self.mount(static_root, static(static_dir))
+            self.mount(static_root, static(static_dir, backend=static_backend))
+
+        # Conditional responses
+        self._enable_etags = enable_etags
 
         # Media
-        self.media_handlers = get_default_handlers()
+        self.media_handlers = get_default_handlers(self._json_engine)
         self._media_type = ""
         self.media_type = media_type
 
         # HTTP middleware
+        # NOTE: middleware are nested as they are added, and flattened
+        # into a pipeline on the first request.
+        self._http_middleware: HTTPApp = self.http_router
+        self._http_middleware_compiled = True
         self.exception_middleware = HTTPErrorMiddleware(
             self.http_router, debug=self._debug
         )
@@ -167,6 +232,16 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         # Lifespan middleware
         self._lifespan = Lifespan()
 
+        # Executors
+        self.executors: Dict[str, Union[Executor, ProcessExecutor]] = {}
+        # NOTE: the default process executor is shared by all applications.
+        # It is created by the first `@view(executor="process")`, i.e.
+        # before startup, and its pool of processes is started again if
+        # needed after a shutdown.
+        self.on("startup", start_default_process_executor)
+        self.on("shutdown", shutdown_default_process_executor)
+        self.on("shutdown", self.broadcast.close)
+
         # ASGI middleware
         if allowed_hosts is None:
             allowed_hosts = ["*"]
@@ -188,9 +263,15 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
     @debug.setter
     def debug(self, debug: bool):
         self._debug = debug
+        self.http_router.debug = debug
         self.exception_middleware.debug = debug
         self.server_error_middleware.debug = debug
 
+    @property
+    def json_engine(self) -> JSONEngine:
+        """The JSON engine configured when instanciating the application."""
+        return self._json_engine
+
     @property
     def media_type(self) -> str:
         """The media type configured when instanciating the application."""
@@ -243,14 +324,14 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
     def mount(self, prefix: str, app: Union["App", ASGIApp, WSGIApp]):
         """Mount another WSGI or ASGI app at the given prefix.
 
+        Requests are dispatched to the app mounted at the longest prefix
+        of the requested path. Prefixes match on path segment boundaries.
+
         # Parameters
         prefix (str): A path prefix where the app should be mounted, e.g. `"/myapp"`.
         app: An object implementing [WSGI](https://wsgi.readthedocs.io) or [ASGI](https://asgi.readthedocs.io) protocol.
         """
-        if not prefix.startswith("/"):
-            prefix = "/" + prefix
-
-        self._prefix_to_app[prefix] = app
+        prefix = self._mounts.add(prefix, app)
 
         if isinstance(app, App) and app.name is not None:
             self._name_to_prefix_and_app[app.name] = (prefix, app)
@@ -304,9 +385,59 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         # See Also
         - [Middleware](../guides/http/middleware.md)
         """
-        self.exception_middleware.app = middleware_cls(
-            self.exception_middleware.app, app=self, **kwargs
+        self._http_middleware = middleware_cls(
+            self._http_middleware, app=self, **kwargs
+        )
+        self._http_middleware_compiled = False
+
+    def add_executor(
+        self, name: str, max_workers: int = None, thread_name_prefix: str = None
+    ) -> Executor:
+        """Register a named executor for synchronous code.
+
+        Executors are shut down when the application shuts down.
+
+        # Parameters
+        name (str): the name of the executor.
+        max_workers (int): the maximum number of threads.
+        thread_name_prefix (str): a prefix for the names of threads.
+
+        # Returns
+        executor (Executor): the new executor.
+
+        # See Also
+        - [Executor](./executors.md#executor)
+        """
+        executor = Executor(
+            name, max_workers=max_workers, thread_name_prefix=thread_name_prefix
         )
+        self.executors[name] = executor
+        self.on("shutdown", partial(executor.shutdown, wait=False))
+        return executor
+
+    def add_process_executor(
+        self, name: str, max_workers: int = None
+    ) -> ProcessExecutor:
+        """Register a named executor for CPU-bound views.
+
+        The pool of processes is started when the application starts up,
+        and stopped when the application shuts down.
+
+        # Parameters
+        name (str): the name of the executor.
+        max_workers (int): the maximum number of processes.
+
+        # Returns
+        executor (ProcessExecutor): the new executor.
+
+        # See Also
+        - [ProcessExecutor](./executors.md#processexecutor)
+        """
+        executor = ProcessExecutor(name, max_workers=max_workers)
+        self.executors[name] = executor
+        self.on("startup", executor.start)
+        self.on("shutdown", partial(executor.shutdown, wait=False))
+        return executor
 
     def add_asgi_middleware(self, middleware_cls, **kwargs):
         """Register an ASGI middleware class.
@@ -358,19 +489,26 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
             return handler
 
     async def dispatch_http(self, receive: Receive, send: Send, scope: Scope):
-        req = Request(scope, receive)
+        req = Request(scope, receive, json_engine=self._json_engine)
         res = Response(
             req,
             media_type=self.media_type,
             media_handler=self.media_handlers[self.media_type],
+            auto_etag=self._enable_etags,
         )
-        res: Response = await self.server_error_middleware(req, res)
+        if not self._http_middleware_compiled:
+            self.exception_middleware.app = compile_middleware(
+                self._http_middleware
+            )
+            self._http_middleware_compiled = True
+        res, exc = await self.server_error_middleware.process(req, res)
 
         await res(receive, send)
 
         # Re-raise the exception to allow the server to log the error
         # and for the test client to optionally re-raise it too.
-        self.server_error_middleware.raise_if_exception()
+        if exc is not None:
+            raise exc from None
 
     async def dispatch_websocket(
         self, receive: Receive, send: Send, scope: Scope
@@ -390,16 +528,13 @@ class App(TemplatesMixin, RoutingMixin, metaclass=DocsMeta):
         path: str = scope["path"]
 
         # Return a sub-mounted extra app, if found
-        for prefix, app in self._prefix_to_app.items():
-            if not path.startswith(prefix):
-                continue
+        mount = self._mounts.match(path)
+        if mount is not None:
+            prefix, app = mount
             # Remove prefix from path so that the request is made according
             # to the mounted app's point of view.
             scope["path"] = path[len(prefix) :]
-            try:
-                return app(scope)
-            except TypeError:
-                return WSGIResponder(app, scope)
+            return app(scope)
 
         return self.asgi(scope)
 
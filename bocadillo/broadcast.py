@@ -0,0 +1,315 @@
+"""Publish/subscribe over WebSockets.
+
+A [Broadcast](#broadcast) hub sends messages published on a **topic** to all
+the WebSockets subscribed to it. Each application has a hub, available as
+`app.broadcast`, and WebSockets can subscribe to topics with
+`await ws.subscribe(topic)`.
+
+Messages are serialized once per publication, and sent to each WebSocket
+through a bounded queue, so that a slow client does not delay the others.
+When the queue of a WebSocket is full, one of the following policies applies:
+
+| Policy            | Behavior                                                |
+| ----------------- | ------------------------------------------------------- |
+| `"drop_oldest"`   | The oldest queued message is dropped (default).         |
+| `"disconnect"`    | The WebSocket is closed with `1008` (Policy Violation). |
+| `"block"`         | The publisher waits until there is room in the queue.   |
+
+Messages go through a [BroadcastBackend](#broadcastbackend). The default
+[MemoryBackend](#memorybackend) delivers messages within the current process.
+Other backends (e.g. based on Redis) can deliver messages published by
+other worker processes.
+"""
+
+import asyncio
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Set,
+    Union,
+)
+
+from .app_types import Event
+from .json_engines import JSONEngine, StdlibEngine
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .websockets import WebSocket
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+BLOCK = "block"
+POLICIES = (DROP_OLDEST, DISCONNECT, BLOCK)
+
+DEFAULT_QUEUE_SIZE = 64
+
+Message = Union[str, bytes]
+Deliver = Callable[[str, Message], Awaitable[None]]
+
+
+class BroadcastBackend:
+    """Interface for broadcast backends.
+
+    A backend transports serialized messages between publishers and
+    the [Broadcast](#broadcast) hubs subscribed to their topic. Messages
+    are `str` (sent as text) or `bytes` (sent as binary).
+    """
+
+    async def connect(self, deliver: Deliver):
+        """Start receiving messages.
+
+        # Parameters
+        deliver (coroutine function):
+            must be called as `deliver(topic, message)` for each message
+            published on a subscribed topic.
+        """
+        raise NotImplementedError
+
+    async def disconnect(self):
+        """Stop receiving messages."""
+        raise NotImplementedError
+
+    async def subscribe(self, topic: str):
+        """Start receiving messages published on a topic."""
+        raise NotImplementedError
+
+    async def unsubscribe(self, topic: str):
+        """Stop receiving messages published on a topic."""
+        raise NotImplementedError
+
+    async def publish(self, topic: str, message: Message):
+        """Publish a message on a topic."""
+        raise NotImplementedError
+
+
+class MemoryBackend(BroadcastBackend):
+    """An in-process broadcast backend."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+        self._topics: Set[str] = set()
+
+    async def connect(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def disconnect(self):
+        self._deliver = None
+
+    async def subscribe(self, topic: str):
+        self._topics.add(topic)
+
+    async def unsubscribe(self, topic: str):
+        self._topics.discard(topic)
+
+    async def publish(self, topic: str, message: Message):
+        if self._deliver is not None and topic in self._topics:
+            await self._deliver(topic, message)
+
+
+class _Subscriber:
+    # A WebSocket subscribed to some topics, and its queue of messages.
+
+    def __init__(self, hub: "Broadcast", ws: "WebSocket"):
+        self.hub = hub
+        self.ws = ws
+        self.topics: Set[str] = set()
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(hub.queue_size)
+        self.dropped = 0
+        self.closed = asyncio.Event()
+        self._writing = True
+        self._writer = asyncio.ensure_future(self._write())
+
+    async def push(self, event: Event):
+        if self.closed.is_set():
+            return
+        try:
+            self.queue.put_nowait(event)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        policy = self.hub.policy
+        if policy == DROP_OLDEST:
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+            self.dropped += 1
+        elif policy == BLOCK:
+            await self._put_unless_closed(event)
+        else:
+            assert policy == DISCONNECT
+            await self.hub._evict(self, code=1008)
+
+    async def _put_unless_closed(self, event: Event):
+        # NOTE: once stopped, nothing drains the queue anymore.
+        put = asyncio.ensure_future(self.queue.put(event))
+        closed = asyncio.ensure_future(self.closed.wait())
+        try:
+            await asyncio.wait(
+                {put, closed}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            put.cancel()
+            closed.cancel()
+
+    async def _write(self):
+        while True:
+            event = await self.queue.get()
+            try:
+                await self.ws.send_event(event)
+            except Exception:  # pylint: disable=broad-except
+                # Connection is closed.
+                self._writing = False
+                await self.hub._evict(self)
+                return
+
+    def stop(self):
+        self.closed.set()
+        if self._writing:
+            self._writing = False
+            self._writer.cancel()
+
+
+class Broadcast:
+    """A hub that sends messages published on topics to WebSockets.
+
+    # Parameters
+    backend (BroadcastBackend):
+        the backend used to transport messages.
+        Defaults to a [MemoryBackend](#memorybackend).
+    queue_size (int):
+        the maximum number of messages queued for each WebSocket.
+        Defaults to `64`.
+    policy (str):
+        what happens when the queue of a WebSocket is full:
+        `"drop_oldest"`, `"disconnect"` or `"block"`.
+        Defaults to `"drop_oldest"`.
+    json_engine (JSONEngine):
+        the engine used to serialize messages that are neither `str`
+        nor `bytes`. Defaults to the standard library's `json` module.
+
+    # Raises
+    ValueError: if `policy` is unknown.
+    """
+
+    def __init__(
+        self,
+        backend: BroadcastBackend = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        policy: str = DROP_OLDEST,
+        json_engine: JSONEngine = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(
+                f"Unknown policy: {policy} (available: {', '.join(POLICIES)})"
+            )
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.queue_size = queue_size
+        self.policy = policy
+        self.json_engine = json_engine or StdlibEngine()
+        self._connected = False
+        self._subscribers: Dict["WebSocket", _Subscriber] = {}
+        self._topics: Dict[str, Set[_Subscriber]] = {}
+
+    async def _connect(self):
+        if not self._connected:
+            self._connected = True
+            await self.backend.connect(self._deliver)
+
+    def encode(self, value) -> Message:
+        """Serialize a value into a message.
+
+        `str` and `bytes` are used as-is, other values are serialized
+        to JSON text.
+        """
+        if isinstance(value, (str, bytes)):
+            return value
+        return self.json_engine.dumps(value).decode()
+
+    async def publish(self, topic: str, value):
+        """Publish a value on a topic.
+
+        # Parameters
+        topic (str): the name of a topic.
+        value (any): a `str`, `bytes`, or a JSON-serializable value.
+        """
+        await self._connect()
+        await self.backend.publish(topic, self.encode(value))
+
+    async def _deliver(self, topic: str, message: Message):
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return
+        # NOTE: the same event is sent to all subscribers.
+        if isinstance(message, str):
+            event = {"type": "websocket.send", "text": message}
+        else:
+            event = {"type": "websocket.send", "bytes": message}
+        for subscriber in list(subscribers):
+            await subscriber.push(event)
+
+    async def subscribe(self, ws: "WebSocket", topic: str):
+        """Subscribe a WebSocket to a topic.
+
+        This is typically called as `await ws.subscribe(topic)`.
+        """
+        await self._connect()
+        subscriber = self._subscribers.get(ws)
+        if subscriber is None:
+            subscriber = self._subscribers[ws] = _Subscriber(self, ws)
+        subscriber.topics.add(topic)
+        subscribers = self._topics.setdefault(topic, set())
+        subscribers.add(subscriber)
+        if len(subscribers) == 1:
+            await self.backend.subscribe(topic)
+
+    async def unsubscribe(self, ws: "WebSocket", topic: str = None):
+        """Unsubscribe a WebSocket from a topic.
+
+        This is typically called as `await ws.unsubscribe(topic)`.
+
+        # Parameters
+        ws (WebSocket): a WebSocket.
+        topic (str):
+            the name of a topic. If not given, the WebSocket is
+            unsubscribed from all topics.
+        """
+        subscriber = self._subscribers.get(ws)
+        if subscriber is None:
+            return
+        topics = set(subscriber.topics) if topic is None else {topic}
+        for name in topics & subscriber.topics:
+            subscriber.topics.discard(name)
+            subscribers = self._topics[name]
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._topics[name]
+                await self.backend.unsubscribe(name)
+        if not subscriber.topics:
+            subscriber.stop()
+            del self._subscribers[ws]
+
+    async def _evict(self, subscriber: _Subscriber, code: int = None):
+        if self._subscribers.get(subscriber.ws) is not subscriber:
+            return
+        await self.unsubscribe(subscriber.ws)
+        if code is not None:
+            await subscriber.ws.ensure_closed(code)
+
+    def subscribers(self, topic: str) -> int:
+        """Return the number of WebSockets subscribed to a topic."""
+        return len(self._topics.get(topic, ()))
+
+    def dropped(self, ws: "WebSocket") -> int:
+        """Return the number of messages dropped for a WebSocket."""
+        subscriber = self._subscribers.get(ws)
+        return subscriber.dropped if subscriber is not None else 0
+
+    async def close(self):
+        """Unsubscribe all WebSockets and disconnect from the backend."""
+        for ws in list(self._subscribers):
+            await self.unsubscribe(ws)
+        if self._connected:
+            self._connected = False
+            await self.backend.disconnect()
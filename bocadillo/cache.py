@@ -0,0 +1,674 @@
+"""Caching of HTTP responses.
+
+The [cached](#cached) decorator stores the status code, headers and content
+of responses built by a view, so that subsequent requests for the same
+resource are answered without calling the view at all.
+
+Cached responses are kept in a [CacheBackend](#cachebackend):
+
+- [MemoryBackend](#memorybackend) (the default) keeps them in the memory of
+the current process.
+- [SocketBackend](#socketbackend) talks to a [CacheServer](#cacheserver) over
+a Unix socket, which allows to share a cache between multiple worker
+processes on the same machine.
+
+Besides, the [CoalescingMiddleware](#coalescingmiddleware) ensures that
+identical concurrent requests are only processed once.
+"""
+
+import asyncio
+import inspect
+import json
+import struct
+from collections import OrderedDict
+from functools import wraps
+from time import monotonic, time
+from types import MappingProxyType
+from typing import (
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from .app_types import AsyncHandler, HTTPApp
+from .compat import to_async
+from .middleware import Middleware
+from .request import Request
+from .response import Response
+from .views import Handler, View, get_handlers
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+CACHEABLE_METHODS = ("GET", "HEAD")
+# Request headers that identify the user. See `CoalescingMiddleware`.
+CREDENTIALS_HEADERS = ("authorization", "cookie")
+
+
+class CachedResponse(NamedTuple):
+    """A response stored in a cache.
+
+    # Attributes
+    status_code (int): the HTTP status code.
+    headers (dict): the response headers.
+    content (bytes): the response content.
+    stored_at (float): the timestamp at which the response was built.
+    """
+
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    stored_at: float = 0.0
+
+    @property
+    def size(self) -> int:
+        """An estimate of the number of bytes used by this response."""
+        return len(self.content) + sum(
+            len(key) + len(value) for key, value in self.headers.items()
+        )
+
+    def dumps(self) -> bytes:
+        """Serialize the response to bytes."""
+        meta = json.dumps([self.status_code, self.headers, self.stored_at])
+        return meta.encode("utf-8") + b"\n" + self.content
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        """Build a response from the result of [dumps()](#dumps)."""
+        meta, _, content = data.partition(b"\n")
+        status_code, headers, stored_at = json.loads(meta.decode("utf-8"))
+        return cls(status_code, headers, content, stored_at)
+
+
+class CacheStats:
+    """Statistics about the usage of a cache backend by cached views.
+
+    # Attributes
+    hits (int): the number of fresh responses sent from the cache.
+    stale_hits (int): the number of stale responses sent from the cache.
+    misses (int): the number of responses which had to be built.
+    refreshes (int): the number of completed background refreshes.
+    skipped_refreshes (int):
+        the number of background refreshes which were not scheduled because
+        too many refreshes were already running.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.skipped_refreshes = 0
+
+    def __repr__(self):
+        return (
+            f"<CacheStats hits={self.hits} stale_hits={self.stale_hits} "
+            f"misses={self.misses} refreshes={self.refreshes} "
+            f"skipped_refreshes={self.skipped_refreshes}>"
+        )
+
+
+class CacheBackend:
+    """Definition of the cache backend interface.
+
+    Subclasses must call `super().__init__()`.
+
+    # Attributes
+    stats (CacheStats): usage statistics, local to the current process.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the response stored for a key, or `None`."""
+        raise NotImplementedError
+
+    async def set(self, key: str, response: CachedResponse, ttl: float):
+        """Store a response for `ttl` seconds."""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        """Remove the response stored for a key, if any."""
+        raise NotImplementedError
+
+    async def clear(self):
+        """Remove all stored responses."""
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """A cache backend that stores responses in memory.
+
+    When storing a response would exceed `max_bytes`, the least recently
+    used responses are evicted.
+
+    # Parameters
+    max_bytes (int):
+        the maximum total size of stored responses.
+        Defaults to `DEFAULT_MAX_BYTES` (64MB).
+
+    # Attributes
+    currsize (int): the total size of stored responses.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.currsize = 0
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = (
+            OrderedDict()
+        )
+
+    def _pop(self, key: str):
+        _, response = self._entries.pop(key)
+        self.currsize -= response.size
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: CachedResponse, ttl: float):
+        if key in self._entries:
+            self._pop(key)
+        size = response.size
+        if size > self.max_bytes:
+            return
+        while self._entries and self.currsize + size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+        self._entries[key] = (monotonic() + ttl, response)
+        self.currsize += size
+
+    async def delete(self, key: str):
+        if key in self._entries:
+            self._pop(key)
+
+    async def clear(self):
+        self._entries.clear()
+        self.currsize = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Socket protocol.
+# Request: header (operation, TTL, key length, value length), key, value.
+# Reply: header (found, value length), value.
+_REQUEST = struct.Struct(">cdII")
+_REPLY = struct.Struct(">?I")
+_GET, _SET, _DELETE, _CLEAR = b"G", b"S", b"D", b"C"
+# Raised when the cache server is unreachable or closes the connection.
+_CONNECTION_ERRORS = (OSError, asyncio.IncompleteReadError)
+
+
+class SocketBackend(CacheBackend):
+    """A cache backend that connects to a [CacheServer](#cacheserver).
+
+    If the server cannot be reached, responses are not found in the cache
+    and are not stored, so that views are still served.
+
+    # Parameters
+    path (str): the path to the Unix socket of the server.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    async def _request(
+        self, op: bytes, key: str = "", value: bytes = b"", ttl: float = 0
+    ) -> Optional[bytes]:
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        try:
+            raw_key = key.encode("utf-8")
+            writer.write(
+                _REQUEST.pack(op, ttl, len(raw_key), len(value))
+                + raw_key
+                + value
+            )
+            found, length = _REPLY.unpack(await reader.readexactly(_REPLY.size))
+            data = await reader.readexactly(length)
+        finally:
+            writer.close()
+        return data if found else None
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            data = await self._request(_GET, key)
+        except _CONNECTION_ERRORS:
+            return None
+        return CachedResponse.loads(data) if data is not None else None
+
+    async def set(self, key: str, response: CachedResponse, ttl: float):
+        try:
+            await self._request(_SET, key, response.dumps(), ttl)
+        except _CONNECTION_ERRORS:
+            pass
+
+    async def delete(self, key: str):
+        try:
+            await self._request(_DELETE, key)
+        except _CONNECTION_ERRORS:
+            pass
+
+    async def clear(self):
+        await self._request(_CLEAR)
+
+
+class CacheServer:
+    """A server that exposes a cache backend over a Unix socket.
+
+    Typically, the server is started in a single process (e.g. a dedicated
+    one, see [run_cache_server](#run-cache-server)) and worker processes
+    use a [SocketBackend](#socketbackend) connected to the same `path`.
+
+    # Parameters
+    path (str): the path to the Unix socket.
+    backend (CacheBackend):
+        where responses are stored.
+        Defaults to a new [MemoryBackend](#memorybackend).
+    """
+
+    def __init__(self, path: str, backend: CacheBackend = None):
+        self.path = path
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start accepting connections."""
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.path
+        )
+
+    async def close(self):
+        """Stop accepting connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            op, ttl, key_length, value_length = _REQUEST.unpack(
+                await reader.readexactly(_REQUEST.size)
+            )
+            key = (await reader.readexactly(key_length)).decode("utf-8")
+            value = await reader.readexactly(value_length)
+
+            reply = None
+            if op == _GET:
+                response = await self.backend.get(key)
+                if response is not None:
+                    reply = response.dumps()
+            elif op == _SET:
+                await self.backend.set(key, CachedResponse.loads(value), ttl)
+            elif op == _DELETE:
+                await self.backend.delete(key)
+            elif op == _CLEAR:
+                await self.backend.clear()
+
+            data = reply or b""
+            writer.write(_REPLY.pack(reply is not None, len(data)) + data)
+            await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+
+def run_cache_server(path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+    """Run a [CacheServer](#cacheserver) backed by a memory cache forever.
+
+    # Parameters
+    path (str): the path to the Unix socket.
+    max_bytes (int): passed to [MemoryBackend](#memorybackend).
+    """
+    server = CacheServer(path, backend=MemoryBackend(max_bytes=max_bytes))
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(server.start())
+    try:
+        loop.run_forever()
+    finally:
+        loop.run_until_complete(server.close())
+
+
+default_backend = MemoryBackend()
+
+
+def _snapshot(res: Response) -> Optional[CachedResponse]:
+    # NOTE: streamed responses and files have no `content`.
+    if res.content is None:
+        return None
+    content = res.content
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    status_code = res.status_code if res.status_code is not None else 200
+    return CachedResponse(status_code, dict(res.headers), content, time())
+
+
+def _sets_cookies(res: Response) -> bool:
+    return any(name.lower() == "set-cookie" for name in res.headers)
+
+
+def _restore(res: Response, response: CachedResponse):
+    res.status_code = response.status_code
+    res.headers.update(response.headers)
+    res.content = response.content
+
+
+def get_cache_key(
+    req: Request,
+    namespace: str = "",
+    query_params: Iterable[str] = None,
+    vary: Iterable[str] = (),
+) -> str:
+    """Build the cache key of a request.
+
+    # Parameters
+    req (Request): a request object.
+    namespace (str): a prefix for the key, e.g. the name of the view.
+    query_params (list of str):
+        names of the query parameters that select the resource.
+        If `None` (the default), all query parameters are used.
+    vary (list of str):
+        names of request headers that select the representation
+        of the resource.
+    """
+    # NOTE: `HEAD` is answered with the response to `GET`.
+    method = "GET" if req.method == "HEAD" else req.method
+    items = sorted(req.query_params.multi_items())
+    if query_params is not None:
+        items = [(name, value) for name, value in items if name in query_params]
+    query = "&".join(f"{name}={value}" for name, value in items)
+    headers = "&".join(
+        f"{header}={req.headers.get(header, '')}" for header in vary
+    )
+    return f"{namespace}|{method}|{req.url.path}?{query}|{headers}"
+
+
+def cached(
+    ttl: float = DEFAULT_TTL,
+    query_params: Iterable[str] = None,
+    vary: Iterable[str] = (),
+    backend: CacheBackend = None,
+    stale_ttl: float = 0,
+    max_refreshes: int = None,
+):
+    """Cache the responses built by a view.
+
+    Can decorate a function-based view, a class-based view, one of its
+    handlers, or a view created with `@view()`. Only successful (`200`)
+    responses to `GET` and `HEAD` requests are cached, and streamed
+    responses, files or responses that set cookies are never cached.
+    Responses that vary on headers not listed in `vary` (including
+    `Vary: *`) are not cached either.
+    If a fresh response is found in the cache, the view is not called.
+
+    Hooks (see [hooks](./hooks.md)) applied on top of `@cached()` are called
+    for cached responses too.
+
+    # Parameters
+    ttl (float):
+        the number of seconds responses are fresh for.
+        Defaults to `DEFAULT_TTL` (60).
+    query_params (list of str):
+        names of the query parameters that select the resource.
+        If `None` (the default), all query parameters are used.
+    vary (list of str):
+        names of request headers that select the representation of the
+        resource, e.g. `["accept-language"]`. They are added to the `Vary`
+        header of responses.
+    backend (CacheBackend):
+        where responses are stored.
+        Defaults to a process-wide [MemoryBackend](#memorybackend).
+    stale_ttl (float):
+        the number of seconds responses may still be sent once they are not
+        fresh anymore (stale-while-revalidate). When a stale response is
+        sent, the view is called in a [background task] to refresh the cache.
+        Defaults to `0`.
+    max_refreshes (int):
+        the maximum number of background refreshes running at the same time
+        for this view. Stale responses are still sent when this limit is
+        reached, but no refresh is scheduled. Defaults to `None` (no limit).
+
+    [background task]: ../guides/http/background-tasks.md
+    """
+    if query_params is not None:
+        query_params = frozenset(query_params)
+    vary = tuple(header.lower() for header in vary)
+
+    def get_backend() -> CacheBackend:
+        # NOTE: resolved lazily so that `default_backend` can be replaced.
+        return backend if backend is not None else default_backend
+
+    def decorate_handler(handler: Handler) -> Handler:
+        namespace = f"{handler.__module__}.{handler.__qualname__}"
+        async_handler = to_async(handler)
+        # Responses being refreshed in the background, by key.
+        refreshing: Dict[str, asyncio.Future] = {}
+
+        async def build(args: tuple, kwargs: dict, res: Response):
+            await async_handler(*args, **kwargs)
+
+            if vary:
+                res.headers["vary"] = ", ".join(
+                    filter(None, (res.headers.get("vary"), *vary))
+                )
+
+            if res.status_code not in (None, 200) or _sets_cookies(res):
+                return None
+
+            # NOTE: the cache key only accounts for the headers in `vary`.
+            varying = {
+                name.strip().lower()
+                for name in res.headers.get("vary", "").split(",")
+            }
+            if not varying <= {"", *vary}:
+                return None
+
+            return _snapshot(res)
+
+        def schedule_refresh(
+            cache: CacheBackend, key: str, args: tuple, kwargs: dict
+        ):
+            if key in refreshing:
+                return
+            if max_refreshes is not None and len(refreshing) >= max_refreshes:
+                cache.stats.skipped_refreshes += 1
+                return
+
+            stale_res = next(arg for arg in args if isinstance(arg, Response))
+            fresh_res = Response(
+                stale_res.request,
+                # NOTE: the original response has already been sent, so the
+                # view builds a new one with the same configuration.
+                media_type=stale_res._media_type,
+                media_handler=stale_res._media_handler,
+            )
+            fresh_args = tuple(
+                fresh_res if arg is stale_res else arg for arg in args
+            )
+
+            async def refresh():
+                try:
+                    response = await build(fresh_args, kwargs, fresh_res)
+                    if response is not None:
+                        await cache.set(key, response, ttl + stale_ttl)
+                    cache.stats.refreshes += 1
+                finally:
+                    del refreshing[key]
+
+            # NOTE: the refresh runs in its own task, so that the key is
+            # released even if the background task of the response is
+            # replaced (e.g. by an after hook) or not run (e.g. if sending
+            # the response fails). The background task only waits for it.
+            task = refreshing[key] = asyncio.ensure_future(refresh())
+
+            async def wait_refresh():
+                await task
+
+            stale_res.background(wait_refresh)
+
+        @wraps(handler)
+        async def with_cache(*args, **kwargs):
+            # NOTE: methods have `self` as a first parameter.
+            req, res = args[:2] if len(args) == 2 else args[1:3]
+            assert isinstance(req, Request)
+            assert isinstance(res, Response)
+
+            if req.method not in CACHEABLE_METHODS:
+                await async_handler(*args, **kwargs)
+                return
+
+            key = get_cache_key(req, namespace, query_params, vary)
+            cache = get_backend()
+
+            hit = await cache.get(key)
+            if hit is not None:
+                age = time() - hit.stored_at
+                if age < ttl:
+                    cache.stats.hits += 1
+                    _restore(res, hit)
+                    return
+                if age < ttl + stale_ttl:
+                    cache.stats.stale_hits += 1
+                    _restore(res, hit)
+                    schedule_refresh(cache, key, args, kwargs)
+                    return
+
+            cache.stats.misses += 1
+            response = await build(args, kwargs, res)
+            if response is not None:
+                await cache.set(key, response, ttl + stale_ttl)
+
+        return with_cache
+
+    def decorate_view(vue: View) -> View:
+        # NOTE: handlers may be shared between methods (e.g. `GET` and
+        # `HEAD`), so each of them is decorated only once.
+        decorated: Dict[AsyncHandler, AsyncHandler] = {}
+
+        def get_decorated(handler: AsyncHandler) -> AsyncHandler:
+            if handler not in decorated:
+                decorated[handler] = decorate_handler(handler)
+            return decorated[handler]
+
+        for method in (*vue.handlers, "HANDLE"):
+            handler = getattr(vue, method.lower(), None)
+            if handler is not None:
+                setattr(vue, method.lower(), get_decorated(handler))
+        if vue._fallback is not None:
+            vue._fallback = get_decorated(vue._fallback)
+        vue.handlers = MappingProxyType(
+            {
+                method: get_decorated(handler)
+                for method, handler in vue.handlers.items()
+            }
+        )
+        return vue
+
+    def decorate(view: Union[View, Type[View], Handler]):
+        if isinstance(view, View):
+            return decorate_view(view)
+
+        if not inspect.isclass(view):
+            return decorate_handler(cast(Handler, view))
+
+        if hasattr(view, "handle"):
+            # NOTE: `.handle()` takes precedence over other handlers.
+            setattr(view, "handle", decorate_handler(getattr(view, "handle")))
+            return view
+
+        for method, handler in get_handlers(view).items():
+            setattr(view, method, decorate_handler(handler))
+        return view
+
+    return decorate
+
+
+class CoalescingMiddleware(Middleware):
+    """Coalesce identical concurrent `GET` and `HEAD` requests.
+
+    While a request is being processed, identical requests (i.e. with the
+    same cache key, see [get_cache_key](#get-cache-key)) wait for it to
+    finish and receive a copy of its status code, headers and content
+    instead of being processed too. This protects expensive views against
+    bursts of identical requests, e.g. when a cached response expires.
+
+    If the response cannot be copied (streamed responses and files) or
+    sets cookies, the waiting requests are processed normally. If an
+    exception is raised, it is raised for the waiting requests too.
+
+    Requests with credentials (`Authorization` or `Cookie` headers) are
+    not coalesced, unless these headers are listed in `vary`, so that
+    personalized responses are never shared between users.
+
+    # Parameters
+    vary (list of str):
+        names of request headers that select the representation
+        of the resource. Requests are only coalesced if these headers
+        have the same values.
+    """
+
+    def __init__(
+        self, inner: HTTPApp, app=None, vary: Iterable[str] = (), **kwargs
+    ):
+        super().__init__(inner, app, vary=vary, **kwargs)
+        self.vary = tuple(header.lower() for header in vary)
+        self._credentials = tuple(
+            header for header in CREDENTIALS_HEADERS if header not in self.vary
+        )
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def process(self, req: Request, res: Response) -> Response:
+        if req.method not in CACHEABLE_METHODS or any(
+            header in req.headers for header in self._credentials
+        ):
+            return await super().process(req, res)
+
+        key = get_cache_key(req, vary=self.vary)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # NOTE: shield the shared future so that cancelling this
+            # request does not cancel the others.
+            shared: Optional[CachedResponse] = await asyncio.shield(inflight)
+            if shared is None:
+                return await super().process(req, res)
+            _restore(res, shared)
+            return res
+
+        future = asyncio.get_event_loop().create_future()
+        self._inflight[key] = future
+        try:
+            res = await super().process(req, res)
+        except Exception as exc:
+            future.set_exception(exc)
+            # NOTE: mark the exception as retrieved, in case no request
+            # was waiting for it.
+            future.exception()
+            raise
+        except BaseException:
+            future.set_result(None)
+            raise
+        else:
+            future.set_result(None if _sets_cookies(res) else _snapshot(res))
+        finally:
+            del self._inflight[key]
+
+        return res
+
+    __call__ = process
@@ -1,5 +1,6 @@
 import asyncio
 import re
+from functools import wraps
 from typing import (
     Callable,
     cast,
@@ -13,6 +14,8 @@ from typing import (
 
 from starlette.concurrency import run_in_threadpool
 
+from .executors import Executor
+
 _CAMEL_REGEX = re.compile(r"(.)([A-Z][a-z]+)")
 _SNAKE_REGEX = re.compile(r"([a-z0-9])([A-Z])")
 
@@ -23,6 +26,7 @@ async def call_async(
     func: Union[Callable[..., _V], Callable[..., Awaitable[_V]]],
     *args: Any,
     sync: Optional[bool] = None,
+    executor: Optional[Executor] = None,
     **kwargs: Any
 ) -> _V:
     """Call a function in an async manner.
@@ -34,17 +38,61 @@ async def call_async(
     sync (bool):
         A hint as to whether `func` is synchronous. If not given, it is
         inferred as `asyncio.iscoroutinefunction(func)`.
+    executor (Executor):
+        An optional executor used to run `func` if it is synchronous,
+        instead of the default thread pool.
 
     # See Also
     - [Executing code in thread or process pools](https://docs.python.org/3/library/asyncio-eventloop.html#executing-code-in-thread-or-process-pools)
     """
     if sync or (sync is None and not asyncio.iscoroutinefunction(func)):
+        if executor is not None:
+            return await executor.run(func, *args, **kwargs)
         return await run_in_threadpool(func, *args, **kwargs)
 
     async_func = cast(Callable[..., Awaitable[_V]], func)
     return await async_func(*args, **kwargs)
 
 
+def to_async(
+    func: Union[Callable[..., _V], Callable[..., Awaitable[_V]]],
+    executor: Optional[Executor] = None,
+) -> Callable[..., Awaitable[_V]]:
+    """Convert a function to a coroutine function, once and for all.
+
+    This is the registration-time counterpart of [call_async](#call-async):
+    introspection is performed here instead of on every call.
+
+    # Parameters
+    func (Callable):
+        a coroutine function (returned as-is) or a regular function
+        (wrapped so that it is run in the thread pool).
+    executor (Executor):
+        An optional executor used to run `func` if it is synchronous,
+        instead of the default thread pool.
+
+    # Returns
+    async_func (Callable): a coroutine function.
+    """
+    if asyncio.iscoroutinefunction(func):
+        return cast(Callable[..., Awaitable[_V]], func)
+
+    sync_func = cast(Callable[..., _V], func)
+
+    if executor is not None:
+        run = executor.run
+
+        async def run_in_executor(*args: Any, **kwargs: Any) -> _V:
+            return await run(sync_func, *args, **kwargs)
+
+        return wraps(func)(run_in_executor)
+
+    async def run_sync(*args: Any, **kwargs: Any) -> _V:
+        return await run_in_threadpool(sync_func, *args, **kwargs)
+
+    return wraps(func)(run_sync)
+
+
 def camel_to_snake(name: str) -> str:
     """Convert a `CamelCase` name to its `snake_case` version."""
     s1 = _CAMEL_REGEX.sub(r"\1_\2", name)
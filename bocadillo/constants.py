@@ -34,3 +34,4 @@ class CONTENT_TYPE:
     PLAIN_TEXT = "text/plain"
     HTML = "text/html"
     JSON = "application/json"
+    NDJSON = "application/x-ndjson"
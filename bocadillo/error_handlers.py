@@ -20,10 +20,10 @@ async def error_to_html(req: Request, res: Response, exc: HTTPError):
     ```
     """
     res.status_code = exc.status_code
-    html = f"<h1>{exc.title}</h1>"
     if exc.detail:
-        html += f"\n<p>{exc.detail}</p>"
-    res.html = html
+        res.html = f"<h1>{exc.title}</h1>\n<p>{exc.detail}</p>"
+    else:
+        res.html = exc.info.html
 
 
 async def error_to_media(req: Request, res: Response, exc: HTTPError):
@@ -65,7 +65,7 @@ async def error_to_text(req: Request, res: Response, exc: HTTPError):
     ```
     """
     res.status_code = exc.status_code
-    text = exc.title
     if exc.detail:
-        text += f"\n{exc.detail}"
-    res.text = text
+        res.text = f"{exc.title}\n{exc.detail}"
+    else:
+        res.text = exc.info.text
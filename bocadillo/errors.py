@@ -1,17 +1,46 @@
+import reprlib
 import traceback
 from http import HTTPStatus
-from typing import Any, Dict, Optional, Type, Union
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type, Union
 
 import jinja2
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import HTMLResponse, PlainTextResponse
 
 from .app_types import _E, ErrorHandler, HTTPApp
-from .compat import call_async
+from .compat import to_async
 from .misc import read_asset
 from .request import Request
 from .response import Response
 
 
+class StatusInfo(NamedTuple):
+    """Precomputed information about an HTTP status.
+
+    # Attributes
+    status (HTTPStatus): the status.
+    title (str): the status code and phrase, e.g. `"404 Not Found"`.
+    text (bytes): the encoded body of plain text error responses.
+    html (bytes): the encoded body of HTML error responses.
+    """
+
+    status: HTTPStatus
+    title: str
+    text: bytes
+    html: bytes
+
+    @classmethod
+    def create(cls, status: HTTPStatus) -> "StatusInfo":
+        title = f"{status.value} {status.phrase}"
+        return cls(status, title, title.encode(), f"<h1>{title}</h1>".encode())
+
+
+# Information about all HTTP statuses, indexed by status code.
+STATUSES: Dict[int, StatusInfo] = {
+    status.value: StatusInfo.create(status) for status in HTTPStatus
+}
+
+
 class HTTPError(Exception):
     """Raised when an HTTP error occurs.
 
@@ -25,36 +54,38 @@ class HTTPError(Exception):
         extra detail information about the error. The exact rendering is
         determined by the configured error handler for `HTTPError`.
 
+    # Attributes
+    info (StatusInfo): precomputed information about the status.
+
     # See Also
     - [HTTP response status codes (MDN web docs)](https://developer.mozilla.org/en-US/docs/Web/HTTP/Status)
     """
 
     def __init__(self, status: Union[int, HTTPStatus], detail: Any = ""):
-        if isinstance(status, int):
-            status = HTTPStatus(  # pylint: disable=no-value-for-parameter
-                status
-            )
-        else:
-            assert isinstance(
-                status, HTTPStatus
-            ), f"Expected int or HTTPStatus, got {type(status)}"
-        self._status = status
+        # NOTE: `HTTPStatus` members are `int`s too.
+        assert isinstance(
+            status, int
+        ), f"Expected int or HTTPStatus, got {type(status)}"
+        info = STATUSES.get(status)
+        if info is None:
+            raise ValueError(f"{status} is not a valid HTTPStatus")
+        self.info: StatusInfo = info
         self.detail = detail
 
     @property
     def status_code(self) -> int:
         """Return the HTTP error's status code, e.g. `404`."""
-        return self._status.value
+        return self.info.status.value
 
     @property
     def status_phrase(self) -> str:
         """Return the HTTP error's status phrase, e.g. `"Not Found"`."""
-        return self._status.phrase
+        return self.info.status.phrase
 
     @property
     def title(self) -> str:
         """Return the HTTP error's title, e.g. `"404 Not Found"`."""
-        return f"{self.status_code} {self.status_phrase}"
+        return self.info.title
 
     def __str__(self):
         return self.title
@@ -68,58 +99,94 @@ class ServerErrorMiddleware(HTTPApp):
 
     _template_name = "server_error.jinja"
 
+    # Limits on the local variables rendered for each frame of the
+    # traceback in debug mode.
+    max_locals = 50
+    locals_repr = reprlib.Repr()
+    locals_repr.maxstring = locals_repr.maxother = 500
+
     def __init__(
         self, app: HTTPApp, handler: ErrorHandler, debug: bool = False
     ) -> None:
         self.app = app
-        self.handler = handler
+        self.handler = to_async(handler)
         self.debug = debug
-        self.exception: Optional[BaseException] = None
         self.jinja = jinja2.Environment()
-
-    def generate_html(self, req: Request, exc: BaseException) -> str:
-        template = self.jinja.from_string(read_asset(self._template_name))
-        tb_exc = traceback.TracebackException.from_exception(
-            exc, capture_locals=True
-        )
+        # Compiled on the first debug response.
+        self._template: Optional[jinja2.Template] = None
+
+    def _get_frames(self, exc: BaseException) -> traceback.StackSummary:
+        frames = traceback.TracebackException.from_exception(exc).stack
+        tb_frames = [frame for frame, _ in traceback.walk_tb(exc.__traceback__)]
+        for summary, frame in zip(frames, tb_frames):
+            items = list(frame.f_locals.items())
+            summary.locals = {
+                name: self.locals_repr.repr(value)
+                for name, value in items[: self.max_locals]
+            }
+            if len(items) > self.max_locals:
+                summary.locals["..."] = f"{len(items) - self.max_locals} more"
+        return frames
+
+    async def load_template(self) -> jinja2.Template:
+        """Load and compile the debug template, once.
+
+        The template file is read in the thread pool.
+        """
+        if self._template is None:
+            source = await run_in_threadpool(read_asset, self._template_name)
+            self._template = self.jinja.from_string(source)
+        return self._template
+
+    async def generate_html(self, req: Request, exc: BaseException) -> str:
+        template = await self.load_template()
         return template.render(
             exc_type=exc.__class__.__name__,
             exc=exc,
             url_path=req.url.path,
-            frames=tb_exc.stack,
+            frames=self._get_frames(exc),
         )
 
     def generate_plain_text(self, exc: BaseException) -> str:
         return "".join(traceback.format_tb(exc.__traceback__))
 
-    def debug_response(self, req: Request, exc: BaseException) -> Response:
+    async def debug_response(
+        self, req: Request, exc: BaseException
+    ) -> Response:
         accept = req.headers.get("accept", "")
 
         if "text/html" in accept:
-            content = self.generate_html(req, exc)
+            content = await self.generate_html(req, exc)
             return HTMLResponse(content, status_code=500)
 
         content = self.generate_plain_text(exc)
         return PlainTextResponse(content, status_code=500)
 
-    def raise_if_exception(self):
-        if self.exception is not None:
-            raise self.exception from None
-
-    async def __call__(self, req: Request, res: Response) -> Response:
+    async def process(
+        self, req: Request, res: Response
+    ) -> Tuple[Response, Optional[BaseException]]:
+        """Process a request and catch unhandled exceptions.
+
+        # Returns
+        result (tuple):
+            the response, and the exception raised while processing
+            the request (if any), so that the caller can re-raise it once
+            the response has been sent.
+        """
         try:
             res = await self.app(req, res)
         except BaseException as exc:
-            self.exception = exc
             if self.debug:
                 # In debug mode, return traceback responses.
-                res = self.debug_response(req, exc)
-            await call_async(  # type: ignore
-                self.handler, req, res, HTTPError(500)
-            )
-            return res
+                res = await self.debug_response(req, exc)
+            await self.handler(req, res, HTTPError(500))
+            return res, exc
         else:
-            return res
+            return res, None
+
+    async def __call__(self, req: Request, res: Response) -> Response:
+        res, _ = await self.process(req, res)
+        return res
 
 
 class HTTPErrorMiddleware(HTTPApp):
@@ -132,18 +199,32 @@ class HTTPErrorMiddleware(HTTPApp):
         self.app = app
         self.debug = debug
         self._exception_handlers: Dict[Type[BaseException], ErrorHandler] = {}
+        # Handler resolved for each exception type raised so far.
+        self._resolved: Dict[Type[BaseException], Optional[ErrorHandler]] = {}
 
     def add_exception_handler(
         self, exception_class: Type[_E], handler: ErrorHandler
     ) -> None:
         assert issubclass(exception_class, BaseException)
-        self._exception_handlers[exception_class] = handler
+        self._exception_handlers[exception_class] = to_async(handler)
+        self._resolved.clear()
 
     def _get_exception_handler(self, exc: _E) -> Optional[ErrorHandler]:
-        for cls, handler in self._exception_handlers.items():
-            if issubclass(type(exc), cls):
-                return handler
-        return None
+        exc_type = type(exc)
+        try:
+            return self._resolved[exc_type]
+        except KeyError:
+            pass
+
+        # The most specific handler wins.
+        handler = None
+        for cls in exc_type.__mro__:
+            handler = self._exception_handlers.get(cls)
+            if handler is not None:
+                break
+
+        self._resolved[exc_type] = handler
+        return handler
 
     async def __call__(self, req: Request, res: Response) -> Response:
         try:
@@ -152,7 +233,7 @@ class HTTPErrorMiddleware(HTTPApp):
             handler = self._get_exception_handler(exc)
             if handler is None:
                 raise exc from None
-            await call_async(handler, req, res, exc)  # type: ignore
+            await handler(req, res, exc)
             return res
         else:
             return res
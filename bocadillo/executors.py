@@ -0,0 +1,258 @@
+"""Dedicated executors for synchronous code.
+
+By default, synchronous views, hooks and middleware methods are run in a
+thread pool shared by the whole process. A slow synchronous view can then
+use up all the threads of that pool, and delay unrelated code which also
+needs a thread.
+
+An [Executor](#executor) is a named thread pool that can be dedicated to
+some views, hooks or middleware. Executors are typically created with
+`app.add_executor()`.
+
+CPU-bound views can also be run in a pool of processes, see
+[ProcessExecutor](#processexecutor).
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from importlib import import_module
+from typing import Any, Callable, Dict, NamedTuple, Optional, TypeVar
+
+try:
+    import contextvars  # Python 3.7+ only.
+except ImportError:  # pragma: no cover
+    contextvars = None  # type: ignore
+
+_V = TypeVar("_V")
+
+
+class ExecutorStats(NamedTuple):
+    """Statistics about the usage of an executor.
+
+    # Attributes
+    name (str): the name of the executor.
+    max_workers (int): the maximum number of threads.
+    active (int): the number of functions currently running.
+    queued (int): the number of functions waiting for a thread.
+    """
+
+    name: str
+    max_workers: int
+    active: int
+    queued: int
+
+
+class Executor:
+    """A named thread pool.
+
+    The pool is started on demand, and can be started again after
+    [shutdown()](#shutdown).
+
+    # Parameters
+    name (str): the name of the executor.
+    max_workers (int):
+        the maximum number of threads.
+        Defaults to the same value as for Python's `ThreadPoolExecutor`.
+    thread_name_prefix (str):
+        a prefix for the names of threads.
+        Defaults to `"bocadillo-<name>"`.
+    """
+
+    def __init__(
+        self, name: str, max_workers: int = None, thread_name_prefix: str = None
+    ):
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        if thread_name_prefix is None:
+            thread_name_prefix = f"bocadillo-{name}"
+        self.name = name
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the thread pool."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.thread_name_prefix,
+            )
+
+    def _call(self, func: Callable[..., _V], args: tuple, kwargs: dict) -> _V:
+        with self._lock:
+            self._active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    async def run(
+        self, func: Callable[..., _V], *args: Any, **kwargs: Any
+    ) -> _V:
+        """Run a synchronous function in the executor and await its result.
+
+        As with the default thread pool, the function runs in a copy of
+        the current context, so that it sees the values of context variables.
+        """
+        self.start()
+        call = partial(self._call, func, args, kwargs)
+        if contextvars is not None:
+            call = partial(contextvars.copy_context().run, call)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._pool, call)
+
+    def stats(self) -> ExecutorStats:
+        """Return statistics about the usage of the executor.
+
+        # Returns
+        stats (ExecutorStats): current usage statistics.
+        """
+        queued = 0
+        if self._pool is not None:
+            # NOTE: `ThreadPoolExecutor` keeps pending work items in a queue.
+            queued = self._pool._work_queue.qsize()  # type: ignore
+        return ExecutorStats(self.name, self.max_workers, self._active, queued)
+
+    def shutdown(self, wait: bool = True):
+        """Release the threads.
+
+        # Parameters
+        wait (bool):
+            whether to wait for running and queued functions to complete.
+            Defaults to `True`.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def __repr__(self):
+        return f"<Executor {self.name!r} max_workers={self.max_workers}>"
+
+
+# Functions run by process executors, indexed by `"<module>:<qualname>"`.
+# NOTE: decorated functions cannot be pickled by reference (their module
+# attribute is replaced by the decorator's result), so child processes look
+# them up here instead.
+_process_functions: Dict[str, Callable] = {}
+
+
+def register_process_function(func: Callable) -> str:
+    """Register a function that can be run by a process executor.
+
+    # Returns
+    key (str): the key to pass to `call_process_function()`.
+    """
+    key = f"{func.__module__}:{func.__qualname__}"
+    _process_functions[key] = func
+    return key
+
+
+def call_process_function(key: str, *args: Any) -> Any:
+    """Call a registered function. This is run in child processes."""
+    func = _process_functions.get(key)
+    if func is None:
+        # Child process was not forked from the parent: importing the
+        # function's module registers it again.
+        import_module(key.partition(":")[0])
+        func = _process_functions.get(key)
+    if func is None:
+        raise RuntimeError(
+            f"Function {key} is not known to the child process. "
+            "Process views must be defined at the module level, and "
+            "registered before the application starts."
+        )
+    return func(*args)
+
+
+class ProcessExecutor:
+    """A named pool of processes, for CPU-bound functions.
+
+    Functions and their arguments must be picklable.
+
+    The pool is started on demand, or by [start()](#start), and can be
+    started again after [shutdown()](#shutdown).
+
+    # Parameters
+    name (str): the name of the executor.
+    max_workers (int):
+        the maximum number of processes.
+        Defaults to the number of processors on the machine.
+    """
+
+    def __init__(self, name: str, max_workers: int = None):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.name = name
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    def start(self):
+        """Start the pool of processes."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    async def run(self, func: Callable[..., _V], *args: Any) -> _V:
+        """Run a function in a child process and await its result."""
+        self.start()
+        loop = asyncio.get_event_loop()
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(self._pool, func, *args)
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> ExecutorStats:
+        """Return statistics about the usage of the executor.
+
+        # Returns
+        stats (ExecutorStats): current usage statistics.
+        """
+        active = min(self._pending, self.max_workers)
+        return ExecutorStats(
+            self.name, self.max_workers, active, self._pending - active
+        )
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool of processes.
+
+        # Parameters
+        wait (bool):
+            whether to wait for running and queued functions to complete.
+            Defaults to `True`.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def __repr__(self):
+        return f"<ProcessExecutor {self.name!r} max_workers={self.max_workers}>"
+
+
+_default_process_executor: Optional[ProcessExecutor] = None
+
+
+def get_default_process_executor() -> ProcessExecutor:
+    """Return the process executor used by `@view(executor="process")`."""
+    global _default_process_executor
+    if _default_process_executor is None:
+        _default_process_executor = ProcessExecutor("process")
+    return _default_process_executor
+
+
+def start_default_process_executor():
+    """Start the default process executor, if a view uses it."""
+    if _default_process_executor is not None:
+        _default_process_executor.start()
+
+
+def shutdown_default_process_executor():
+    """Stop the default process executor, if a view uses it."""
+    if _default_process_executor is not None:
+        _default_process_executor.shutdown(wait=False)
@@ -0,0 +1,334 @@
+"""Helpers for sending files, with support for conditional and range requests.
+
+See also:
+
+- [RFC 7232: Conditional Requests](https://tools.ietf.org/html/rfc7232)
+- [RFC 7233: Range Requests](https://tools.ietf.org/html/rfc7233)
+"""
+
+import os
+import stat as _stat
+from calendar import timegm
+from email.utils import formatdate, parsedate
+from mimetypes import guess_type
+from time import monotonic
+from typing import Dict, List, Mapping, Optional, Tuple
+from uuid import uuid4
+
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Send
+
+# How long (in seconds) the result of `os.stat()` on a file is reused.
+STAT_CACHE_TTL = 1.0
+STAT_CACHE_MAX_SIZE = 1024
+
+# Maximum number of ranges honored in a single request. Requests with more
+# ranges receive the whole file.
+MAX_RANGES = 16
+
+# Headers kept on `304 Not Modified` responses.
+# See: https://tools.ietf.org/html/rfc7232#section-4.1
+NOT_MODIFIED_HEADERS = {"cache-control", "etag", "last-modified", "vary"}
+
+Range = Tuple[int, int]
+
+_stat_cache: Dict[str, Tuple[float, os.stat_result]] = {}
+
+
+def stat_file(path: str) -> os.stat_result:
+    """Return the result of `os.stat()` on a regular file.
+
+    Results are cached for `STAT_CACHE_TTL` seconds, so that files sent
+    very often do not cost a system call on every request.
+
+    # Raises
+    RuntimeError: if the file does not exist or is not a regular file.
+    """
+    now = monotonic()
+    cached = _stat_cache.get(path)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise RuntimeError(f"File at path {path} does not exist.") from None
+    if not _stat.S_ISREG(stat_result.st_mode):
+        raise RuntimeError(f"File at path {path} is not a file.")
+
+    if len(_stat_cache) >= STAT_CACHE_MAX_SIZE:
+        _stat_cache.clear()
+    _stat_cache[path] = (now + STAT_CACHE_TTL, stat_result)
+    return stat_result
+
+
+def get_etag(stat_result: os.stat_result) -> str:
+    """Build an entity tag from the modification time and size of a file."""
+    return f'"{int(stat_result.st_mtime):x}-{stat_result.st_size:x}"'
+
+
+def _strip_weak(etag: str) -> str:
+    # Weak comparison is used for `If-None-Match`.
+    # See: https://tools.ietf.org/html/rfc7232#section-3.2
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _parse_http_date(value: str) -> Optional[int]:
+    parsed = parsedate(value)
+    return timegm(parsed) if parsed is not None else None
+
+
+def is_not_modified(
+    headers: Mapping[str, str],
+    etag: str,
+    last_modified: Optional[float] = None,
+) -> bool:
+    """Return whether a `304 Not Modified` response can be sent.
+
+    # Parameters
+    headers (mapping): the request headers, with lowercase keys.
+    etag (str): the current entity tag of the resource.
+    last_modified (float):
+        the modification timestamp of the resource, if known.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {_strip_weak(tag.strip()) for tag in if_none_match.split(",")}
+        return _strip_weak(etag) in etags or "*" in etags
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and int(last_modified) <= since
+
+    return False
+
+
+def parse_range(
+    headers: Mapping[str, str], etag: str, last_modified: float, size: int
+) -> Optional[List[Range]]:
+    """Parse the `Range` header of a request.
+
+    # Returns
+    ranges (list or None):
+        `None` if the whole file should be sent, i.e. if there is no (valid)
+        `Range` header or if `If-Range` does not match. Otherwise, a list of
+        inclusive `(start, end)` byte ranges, which is empty if none of the
+        requested ranges can be satisfied.
+    """
+    header = headers.get("range")
+    if header is None:
+        return None
+
+    if_range = headers.get("if-range")
+    if if_range is not None:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            # NOTE: strong comparison is required here.
+            if if_range != etag:
+                return None
+        elif _parse_http_date(if_range) != int(last_modified):
+            return None
+
+    unit, _, specs = header.partition("=")
+    if unit.strip() != "bytes":
+        return None
+
+    ranges: List[Range] = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if not first:
+                # Suffix range, e.g. `-500` for the last 500 bytes.
+                length = int(last)
+                start, end = max(size - length, 0), size - 1
+                if length == 0:
+                    continue
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+        except ValueError:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    return ranges
+
+
+class FileResponse:
+    """An ASGI response that sends a file from the disk.
+
+    - `HEAD` requests only receive headers.
+    - `304 Not Modified` is sent if the `If-None-Match` or
+    `If-Modified-Since` request headers show that the client is up to date.
+    - `206 Partial Content` is sent for satisfiable `Range` requests.
+    When multiple ranges are requested, they are sent as a
+    `multipart/byteranges` body.
+    - `416 Range Not Satisfiable` is sent if none of the requested ranges
+    can be satisfied.
+
+    # Parameters
+    path (str): a path to a file on this machine.
+    method (str): the request method.
+    request_headers (mapping): the request headers, with lowercase keys.
+    headers (dict): response headers.
+    background (BackgroundTask): an optional background task.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        method: str,
+        request_headers: Mapping[str, str],
+        headers: Dict[str, str],
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.path = path
+        self.method = method
+        self.request_headers = request_headers
+        self.headers = headers
+        self.background = background
+
+    async def __call__(self, receive: Receive, send: Send):
+        stat_result = stat_file(self.path)
+        size = stat_result.st_size
+        etag = get_etag(stat_result)
+        last_modified = stat_result.st_mtime
+
+        headers = self.headers
+        if "content-type" not in headers:
+            headers["content-type"] = (
+                guess_type(self.path)[0] or "application/octet-stream"
+            )
+        headers.setdefault("last-modified", formatdate(last_modified, True))
+        headers.setdefault("etag", etag)
+        headers["accept-ranges"] = "bytes"
+
+        body_parts: List[Tuple[bytes, Range]] = []
+        trailer = b""
+
+        if is_not_modified(self.request_headers, etag, last_modified):
+            status = 304
+            headers = {
+                key: value
+                for key, value in headers.items()
+                if key in NOT_MODIFIED_HEADERS
+            }
+        else:
+            ranges = parse_range(
+                self.request_headers, etag, last_modified, size
+            )
+            if ranges is None:
+                status = 200
+                headers["content-length"] = str(size)
+                body_parts = [(b"", (0, size - 1))]
+            elif not ranges:
+                status = 416
+                headers = {"content-range": f"bytes */{size}"}
+            elif len(ranges) == 1:
+                status = 206
+                start, end = ranges[0]
+                headers["content-range"] = f"bytes {start}-{end}/{size}"
+                headers["content-length"] = str(end - start + 1)
+                body_parts = [(b"", ranges[0])]
+            else:
+                status = 206
+                body_parts, trailer = self._get_multipart(ranges, size)
+                length = len(trailer) + sum(
+                    len(part_headers) + end - start + 1 + 2
+                    for part_headers, (start, end) in body_parts
+                )
+                headers["content-length"] = str(length)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (key.encode("latin-1"), value.encode("latin-1"))
+                    for key, value in headers.items()
+                ],
+            }
+        )
+
+        if self.method == "HEAD" or not body_parts:
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            await self._send_body(send, body_parts, trailer)
+
+        if self.background is not None:
+            await self.background()
+
+    def _get_multipart(
+        self, ranges: List[Range], size: int
+    ) -> Tuple[List[Tuple[bytes, Range]], bytes]:
+        boundary = uuid4().hex
+        content_type = self.headers["content-type"]
+        self.headers["content-type"] = (
+            f"multipart/byteranges; boundary={boundary}"
+        )
+
+        parts = [
+            (
+                (
+                    f"--{boundary}\r\n"
+                    f"content-type: {content_type}\r\n"
+                    f"content-range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode("latin-1"),
+                (start, end),
+            )
+            for start, end in ranges
+        ]
+        trailer = f"--{boundary}--\r\n".encode("latin-1")
+        return parts, trailer
+
+    async def _send_body(
+        self, send: Send, parts: List[Tuple[bytes, Range]], trailer: bytes
+    ):
+        with open(self.path, "rb") as f:
+            for part_headers, (start, end) in parts:
+                if part_headers:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": part_headers,
+                            "more_body": True,
+                        }
+                    )
+                await run_in_threadpool(f.seek, start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await run_in_threadpool(
+                        f.read, min(self.chunk_size, remaining)
+                    )
+                    if not chunk:
+                        # File was truncated in the meantime.
+                        break
+                    remaining -= len(chunk)
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": True,
+                        }
+                    )
+                if part_headers:
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": b"\r\n",
+                            "more_body": True,
+                        }
+                    )
+
+        await send({"type": "http.response.body", "body": trailer})
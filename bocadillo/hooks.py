@@ -2,7 +2,8 @@ import inspect
 from functools import wraps
 from typing import Callable, cast, Dict, Union, Awaitable, Type
 
-from .compat import call_async
+from .compat import to_async
+from .executors import Executor
 from .request import Request
 from .response import Response
 from .routing import HTTPRoute
@@ -18,30 +19,57 @@ AFTER = "after"
 class Hooks:
     """Hooks manager."""
 
-    def before(self, hook: HookFunction, *args, **kwargs):
+    def before(
+        self,
+        hook: HookFunction,
+        *args,
+        executor: Executor = None,
+        **kwargs,
+    ):
         """Register a before hook on a handler.
 
         # Parameters
         hook (callable): a hook function.
+        executor (Executor):
+            if given and `hook` is synchronous, it is run in this executor
+            instead of the default thread pool.
         """
-        return self._hook_decorator(BEFORE, hook, *args, **kwargs)
-
-    def after(self, hook: HookFunction, *args, **kwargs):
+        return self._hook_decorator(
+            BEFORE, hook, *args, executor=executor, **kwargs
+        )
+
+    def after(
+        self,
+        hook: HookFunction,
+        *args,
+        executor: Executor = None,
+        **kwargs,
+    ):
         """Register an after hook on a handler.
 
         # Parameters
         hook (callable): a hook function.
+        executor (Executor):
+            if given and `hook` is synchronous, it is run in this executor
+            instead of the default thread pool.
         """
-        return self._hook_decorator(AFTER, hook, *args, **kwargs)
+        return self._hook_decorator(
+            AFTER, hook, *args, executor=executor, **kwargs
+        )
 
     def _hook_decorator(
-        self, hook_type: str, hook: HookFunction, *args, **kwargs
+        self,
+        hook_type: str,
+        hook: HookFunction,
+        *args,
+        executor: Executor = None,
+        **kwargs,
     ):
+        async_hook = to_async(hook, executor=executor)
+
         # Enclose args and kwargs
         async def hook_func(req: Request, res: Response, params: dict):
-            await call_async(  # type: ignore
-                hook, req, res, params, *args, **kwargs
-            )
+            await async_hook(req, res, params, *args, **kwargs)
 
         def decorator(handler: Union[Type[View], Handler]):
             """Attach the hook to the given handler."""
@@ -68,14 +96,16 @@ def _with_hook(hook_type: str, func: HookFunction, handler: Handler):
             req, res = args[1:3]
         assert isinstance(req, Request)
         assert isinstance(res, Response)
-        await call_async(func, req, res, kw)
+        await func(req, res, kw)
+
+    async_handler = to_async(handler)
 
     if hook_type == BEFORE:
 
         @wraps(handler)
         async def with_before_hook(*args, **kwargs):
             await call_hook(args, kwargs)
-            await call_async(handler, *args, **kwargs)
+            await async_handler(*args, **kwargs)
 
         return with_before_hook
 
@@ -83,7 +113,7 @@ def _with_hook(hook_type: str, func: HookFunction, handler: Handler):
 
     @wraps(handler)
     async def with_after_hook(*args, **kwargs):
-        await call_async(handler, *args, **kwargs)
+        await async_handler(*args, **kwargs)
         await call_hook(args, kwargs)
 
     return with_after_hook
@@ -0,0 +1,151 @@
+"""Pluggable JSON engines.
+
+A JSON engine serializes values to JSON bytes and parses JSON documents.
+The engine configured on the application is used to serialize `res.media`,
+parse `await req.json()` and exchange JSON messages over WebSockets.
+
+The following engines are available:
+
+| Name          | Package                                                 |
+| ------------- | ------------------------------------------------------- |
+| `"stdlib"`    | [json](https://docs.python.org/3/library/json.html)     |
+| `"orjson"`    | [orjson](https://pypi.org/project/orjson/)              |
+| `"rapidjson"` | [python-rapidjson](https://pypi.org/project/python-rapidjson/) |
+| `"ujson"`     | [ujson](https://pypi.org/project/ujson/)                |
+
+Third-party engines require the corresponding package to be installed.
+"""
+
+import json
+from importlib import import_module
+from typing import Any, Callable, Dict, Type, Union
+
+AnyStr = Union[str, bytes]
+
+
+class JSONEngine:
+    """Base class for JSON engines.
+
+    Subclasses must implement [dumps()](#dumps) and [loads()](#loads).
+
+    # Attributes
+    name (str): the name of the engine.
+    """
+
+    name = ""
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to a UTF-8 encoded JSON document.
+
+        # Raises
+        TypeError: if the value is not JSON serializable.
+        """
+        raise NotImplementedError
+
+    def loads(self, data: AnyStr) -> Any:
+        """Parse a JSON document.
+
+        # Raises
+        ValueError: if the document is not valid JSON.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}>"
+
+
+class StdlibEngine(JSONEngine):
+    """JSON engine based on the standard library's `json` module."""
+
+    name = "stdlib"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    def loads(self, data: AnyStr) -> Any:
+        return json.loads(data)
+
+
+class _ModuleEngine(JSONEngine):
+    # An engine backed by a third-party module, imported on instanciation.
+
+    module_name = ""
+
+    def __init__(self):
+        try:
+            module = import_module(self.module_name)
+        except ImportError as exc:
+            raise ImportError(
+                f"The {self.name} JSON engine requires {self.module_name} "
+                "to be installed."
+            ) from exc
+        self._dumps: Callable[[Any], AnyStr] = module.dumps
+        self._loads: Callable[[AnyStr], Any] = module.loads
+
+    def dumps(self, value: Any) -> bytes:
+        return self._dumps(value).encode("utf-8")  # type: ignore
+
+    def loads(self, data: AnyStr) -> Any:
+        return self._loads(data)
+
+
+class OrjsonEngine(_ModuleEngine):
+    """JSON engine based on `orjson`."""
+
+    name = module_name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        # NOTE: orjson serializes to bytes already.
+        return self._dumps(value)  # type: ignore
+
+
+class RapidJSONEngine(_ModuleEngine):
+    """JSON engine based on `python-rapidjson`."""
+
+    name = module_name = "rapidjson"
+
+
+class UJSONEngine(_ModuleEngine):
+    """JSON engine based on `ujson`."""
+
+    name = module_name = "ujson"
+
+
+ENGINES: Dict[str, Type[JSONEngine]] = {
+    engine.name: engine
+    for engine in (OrjsonEngine, RapidJSONEngine, UJSONEngine, StdlibEngine)
+}
+
+
+def get_json_engine(engine: Union[str, JSONEngine]) -> JSONEngine:
+    """Return a JSON engine.
+
+    # Parameters
+    engine (str or JSONEngine):
+        an engine object (returned as-is), the name of an engine,
+        or `"auto"` to use the fastest installed engine, falling back
+        to `"stdlib"`.
+
+    # Raises
+    ValueError: if the engine name is unknown.
+    ImportError: if the package required by the engine is not installed.
+    """
+    if isinstance(engine, JSONEngine):
+        return engine
+
+    if engine == "auto":
+        for engine_cls in ENGINES.values():
+            try:
+                return engine_cls()
+            except ImportError:
+                continue
+
+    try:
+        engine_cls = ENGINES[engine]
+    except KeyError:
+        available = ", ".join(ENGINES)
+        raise ValueError(
+            f"Unknown JSON engine: {engine} (available: {available}, auto)"
+        ) from None
+
+    return engine_cls()
@@ -1,26 +1,112 @@
-import json
-from typing import Any, Callable, TypeVar, Union, Dict
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    TypeVar,
+    Union,
+)
 
 from .constants import CONTENT_TYPE
+from .json_engines import JSONEngine, StdlibEngine
 
 _V = TypeVar("_V")
 
 
-MediaHandler = Callable[[Any], str]
+MediaHandler = Callable[[Any], Union[str, bytes]]
 Handlers = Dict[str, MediaHandler]
 
+_stdlib_engine = StdlibEngine()
 
-def handle_json(value: Union[dict, list]) -> str:
+
+def handle_json(value: Union[dict, list]) -> bytes:
     """A media handler that dumps a value using `json.dumps`."""
-    return json.dumps(value)
+    return _stdlib_engine.dumps(value)
 
 
-def get_default_handlers() -> Handlers:
+def get_default_handlers(json_engine: JSONEngine = None) -> Handlers:
     """Return the default media handlers.
 
-    - `application/json`: [handle_json](#handle-json)
+    - `application/json`: [handle_json](#handle-json), or the `.dumps()`
+    method of `json_engine` if given.
+
+    # Parameters
+    json_engine (JSONEngine): an optional JSON engine.
     """
-    return {CONTENT_TYPE.JSON: handle_json}
+    if json_engine is None:
+        return {CONTENT_TYPE.JSON: handle_json}
+    return {CONTENT_TYPE.JSON: json_engine.dumps}
+
+
+# Encoded values are buffered up to this many bytes before being sent.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _aiter(values: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    if hasattr(values, "__aiter__"):
+        async for value in values:  # type: ignore
+            yield value
+    else:
+        for value in values:  # type: ignore
+            yield value
+
+
+async def stream_media(
+    values: Union[Iterable, AsyncIterable],
+    handler: MediaHandler,
+    ndjson: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Incrementally serialize a sequence of values.
+
+    Each value is serialized on its own using `handler`, so that the
+    whole document never needs to be held in memory.
+
+    # Parameters
+    values (iterable or async iterable): the values to serialize.
+    handler (callable): a media handler, e.g. `app.json_engine.dumps`.
+    ndjson (bool):
+        if `True`, values are separated by newlines
+        ([NDJSON](http://ndjson.org)). Otherwise, they are written as the
+        items of a JSON array. Defaults to `False`.
+    chunk_size (int):
+        serialized values are buffered until at least this many bytes
+        are available. Defaults to `STREAM_CHUNK_SIZE` (64kB).
+
+    # Returns
+    chunks (async iterator of bytes): the serialized document.
+    """
+    if ndjson:
+        start, separator, end = b"", b"\n", b"\n"
+    else:
+        start, separator, end = b"[", b",", b"]"
+
+    buffer: List[bytes] = [start]
+    buffered = len(start)
+    first = True
+
+    async for value in _aiter(values):
+        encoded = handler(value)
+        if isinstance(encoded, str):
+            encoded = encoded.encode("utf-8")
+        if first:
+            first = False
+        else:
+            buffer.append(separator)
+            buffered += len(separator)
+        buffer.append(encoded)
+        buffered += len(encoded)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer.clear()
+            buffered = 0
+
+    if not first or not ndjson:
+        buffer.append(end)
+    yield b"".join(buffer)
 
 
 class UnsupportedMediaType(Exception):
@@ -1,7 +1,16 @@
-from typing import TYPE_CHECKING, Optional
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
 
 from .app_types import ASGIApp, ASGIAppInstance, HTTPApp, Scope
-from .compat import call_async
+from .compat import to_async
+from .executors import Executor
 from .request import Request
 from .response import Response
 
@@ -15,15 +24,36 @@ class Middleware(HTTPApp):
     # Parameters
     inner (callable): the inner middleware that this middleware wraps.
     app (App): the application instance.
+    executor (Executor):
+        An optional executor in which synchronous `before_dispatch()` and
+        `after_dispatch()` methods are run, instead of the default thread
+        pool. Can also be set as a class attribute.
     kwargs (any):
         Keyword arguments passed when registering the middleware on `app`.
     """
 
-    def __init__(self, inner: HTTPApp, app: "App" = None, **kwargs):
+    executor: Optional[Executor] = None
+
+    def __init__(
+        self,
+        inner: HTTPApp,
+        app: "App" = None,
+        executor: Executor = None,
+        **kwargs,
+    ):
         # NOTE: app defaults to `None` to support old-style HTTP middleware.
         self.inner = inner
         self.app = app
         self.kwargs = kwargs
+        if executor is not None:
+            self.executor = executor
+        # NOTE: resolved once, instead of on every request.
+        self._before_dispatch = to_async(
+            self.before_dispatch, executor=self.executor
+        )
+        self._after_dispatch = to_async(
+            self.after_dispatch, executor=self.executor
+        )
 
     async def before_dispatch(
         self, req: Request, res: Response
@@ -73,24 +103,118 @@ class Middleware(HTTPApp):
         # Returns
         res (Response): a Response object.
         """
-        before_res: Optional[Response] = await call_async(  # type: ignore
-            self.before_dispatch, req, res
-        )
+        before_res: Optional[Response] = await self._before_dispatch(req, res)
         if before_res:
             return before_res
 
         res = await self.inner(req, res)
 
-        res = (
-            await call_async(self.after_dispatch, req, res)  # type: ignore
-            or res
-        )
+        res = await self._after_dispatch(req, res) or res
 
         return res
 
     __call__ = process
 
 
+DispatchStep = Callable[[Request, Response], Awaitable[Optional[Response]]]
+
+
+def _overrides(middleware: Middleware, name: str) -> bool:
+    return getattr(type(middleware), name) is not getattr(Middleware, name)
+
+
+def _is_flattenable(app: HTTPApp) -> bool:
+    # Middleware that customize `process()` must keep their own frame.
+    return (
+        isinstance(app, Middleware)
+        and not _overrides(app, "process")
+        and not _overrides(app, "__call__")
+    )
+
+
+class MiddlewarePipeline(HTTPApp):
+    """A flattened chain of HTTP middleware.
+
+    Equivalent to nesting the middleware, but only the overridden
+    `before_dispatch()` and `after_dispatch()` methods are called,
+    in a single loop.
+
+    # Parameters
+    middleware (list of Middleware):
+        middleware instances, from the outermost to the innermost.
+    inner (callable): the HTTP app called after all `before_dispatch()`.
+    """
+
+    def __init__(self, middleware: List[Middleware], inner: HTTPApp):
+        self.middleware = middleware
+        self.inner = inner
+        # Steps are stored along with the depth of their middleware.
+        self._before: List[Tuple[int, DispatchStep]] = [
+            (depth, layer._before_dispatch)
+            for depth, layer in enumerate(middleware)
+            if _overrides(layer, "before_dispatch")
+        ]
+        # NOTE: `after_dispatch()` is called from the innermost middleware.
+        self._after: List[Tuple[int, DispatchStep]] = [
+            (depth, layer._after_dispatch)
+            for depth, layer in reversed(list(enumerate(middleware)))
+            if _overrides(layer, "after_dispatch")
+        ]
+
+    async def __call__(self, req: Request, res: Response) -> Response:
+        # Middleware at this depth and deeper are skipped on the way out.
+        stop = len(self.middleware)
+
+        for depth, before_dispatch in self._before:
+            before_res = await before_dispatch(req, res)
+            if before_res:
+                res = before_res
+                stop = depth
+                break
+        else:
+            res = await self.inner(req, res)
+
+        for depth, after_dispatch in self._after:
+            if depth < stop:
+                res = await after_dispatch(req, res) or res
+
+        return res
+
+
+def compile_middleware(app: HTTPApp) -> HTTPApp:
+    """Flatten a chain of nested HTTP middleware.
+
+    Middleware that override neither `before_dispatch()` nor
+    `after_dispatch()` are dropped from the chain. Middleware that override
+    `process()` are kept as-is, and the chain they wrap is compiled too.
+
+    # Parameters
+    app (callable): the outermost HTTP middleware or app.
+
+    # Returns
+    app (callable): an equivalent HTTP app.
+    """
+    layers: List[Middleware] = []
+    while _is_flattenable(app):
+        middleware = cast(Middleware, app)
+        layers.append(middleware)
+        app = middleware.inner
+
+    if isinstance(app, Middleware):
+        app.inner = compile_middleware(app.inner)
+
+    layers = [
+        layer
+        for layer in layers
+        if _overrides(layer, "before_dispatch")
+        or _overrides(layer, "after_dispatch")
+    ]
+    if not layers:
+        return app
+
+    return MiddlewarePipeline(layers, app)
+
+
 class ASGIMiddleware(ASGIApp):
     """Base class for ASGI middleware classes.
 
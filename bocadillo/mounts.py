@@ -0,0 +1,131 @@
+import inspect
+from functools import partial
+from typing import Any, Dict, Optional, Tuple, Union
+
+from starlette.middleware.wsgi import WSGIResponder
+
+from .app_types import ASGIApp
+from .compat import WSGIApp
+
+
+def is_wsgi(app: Any) -> bool:
+    """Return whether an app implements WSGI rather than ASGI.
+
+    WSGI apps are called with `(environ, start_response)` while ASGI apps
+    are called with `(scope)`, so apps are told apart by the number of
+    required positional parameters of their signature.
+    If the signature cannot be inspected, the app is assumed to be ASGI.
+    """
+    try:
+        signature = inspect.signature(app)
+    except (TypeError, ValueError):
+        return False
+
+    positional = (
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    )
+    required = [
+        param
+        for param in signature.parameters.values()
+        if param.kind in positional and param.default is param.empty
+    ]
+    return len(required) == 2
+
+
+def as_asgi(app: Union[ASGIApp, WSGIApp]) -> ASGIApp:
+    """Return an ASGI adapter for an ASGI or WSGI app.
+
+    ASGI apps are returned as-is, and WSGI apps are wrapped so that they
+    are served by Starlette's `WSGIResponder`.
+    """
+    if is_wsgi(app):
+        return partial(WSGIResponder, app)
+    return app
+
+
+class _MountNode:
+    __slots__ = ("children", "prefix", "app")
+
+    def __init__(self):
+        self.children: Dict[str, "_MountNode"] = {}
+        self.prefix: Optional[str] = None
+        self.app: Any = None
+
+
+class MountTable:
+    """A prefix tree of mounted apps, indexed by URL path segments.
+
+    Lookups resolve to the app mounted at the longest prefix of the requested
+    path, at a cost which depends on the depth of the path rather than on
+    the number of mounted apps.
+
+    A prefix only matches on segment boundaries, e.g. an app mounted at
+    `/static` receives `/static` and `/static/foo.css`, but not `/statistics`.
+
+    Apps are converted to ASGI apps with [as_asgi](#as-asgi) when they are
+    mounted, so that matched apps can be called with the ASGI scope directly.
+    """
+
+    def __init__(self):
+        self._root = _MountNode()
+        self._size = 0
+
+    @staticmethod
+    def normalize(prefix: str) -> str:
+        """Return the canonical form of a mount prefix.
+
+        A leading slash is added if missing, and trailing slashes are removed.
+        As a result, an app mounted at `/` receives all paths.
+        """
+        if not prefix.startswith("/"):
+            prefix = "/" + prefix
+        return prefix.rstrip("/")
+
+    def add(self, prefix: str, app: Union[ASGIApp, WSGIApp]) -> str:
+        """Mount an app at the given prefix.
+
+        If another app was mounted at the same prefix, it is replaced.
+
+        # Returns
+        prefix (str): the normalized prefix.
+        """
+        prefix = self.normalize(prefix)
+        node = self._root
+        if prefix:
+            for segment in prefix[1:].split("/"):
+                node = node.children.setdefault(segment, _MountNode())
+        if node.prefix is None:
+            self._size += 1
+        node.prefix = prefix
+        node.app = as_asgi(app)
+        return prefix
+
+    def match(self, path: str) -> Optional[Tuple[str, ASGIApp]]:
+        """Find the app mounted at the longest prefix of `path`.
+
+        # Returns
+        match (tuple or None):
+            A `(prefix, app)` tuple, where `app` is an ASGI app, or `None`
+            if no app is mounted at a prefix of `path`.
+        """
+        if not self._size:
+            return None
+
+        node = self._root
+        found = node if node.prefix is not None else None
+
+        if path.startswith("/"):
+            for segment in path[1:].split("/"):
+                node = node.children.get(segment)
+                if node is None:
+                    break
+                if node.prefix is not None:
+                    found = node
+
+        if found is None:
+            return None
+        return found.prefix, found.app
+
+    def __len__(self) -> int:
+        return self._size
@@ -1,7 +1,11 @@
-from json import JSONDecodeError
 from typing import Any, AsyncGenerator
 
 from starlette.requests import Request as _Request
+from starlette.types import Receive, Scope
+
+from .json_engines import JSONEngine, StdlibEngine
+
+_stdlib_engine = StdlibEngine()
 
 
 class Request(_Request):
@@ -13,27 +17,47 @@ class Request(_Request):
 
     [starlette-request]: https://www.starlette.io/requests/
 
+    # Parameters
+    scope (dict): the ASGI scope.
+    receive (callable): the ASGI `receive` callable.
+    json_engine (JSONEngine):
+        the engine used to parse JSON (given by the `App`).
+        Defaults to the standard library's `json` module.
+
     # Methods
     `__aiter__`:
         shortcut for `.stream()`. Allows to process the request body in
         byte chunks using `async for chunk in req: ...`.
     """
 
+    def __init__(
+        self,
+        scope: Scope,
+        receive: Receive = None,
+        json_engine: JSONEngine = None,
+    ):
+        super().__init__(scope, receive)
+        self._json_engine = json_engine or _stdlib_engine
+
     async def json(self) -> Any:
         """Parse the request body as JSON.
 
         # Returns
-        json (dict): the result of `json.loads(await self.body())`.
+        json (dict): the result of parsing `await self.body()` with the
+        configured JSON engine.
 
         # Raises
         HTTPError(400): if the JSON is malformed.
         """
-        try:
-            return await super().json()
-        except JSONDecodeError:
-            from .errors import HTTPError  # prevent circular imports
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            try:
+                self._json = self._json_engine.loads(body)
+            except ValueError:
+                from .errors import HTTPError  # prevent circular imports
 
-            raise HTTPError(400, detail="JSON is malformed.")
+                raise HTTPError(400, detail="JSON is malformed.")
+        return self._json
 
     async def __aiter__(self) -> AsyncGenerator[bytes, None]:
         async for chunk in self.stream():
@@ -1,4 +1,5 @@
 import inspect
+from hashlib import blake2b
 from os.path import basename
 from typing import (
     Any,
@@ -6,6 +7,7 @@ from typing import (
     Callable,
     Coroutine,
     Dict,
+    Iterable,
     Optional,
     Union,
 )
@@ -15,11 +17,11 @@ from starlette.requests import Request
 from starlette.responses import (
     Response as _Response,
     StreamingResponse as _StreamingResponse,
-    FileResponse as _FileResponse,
 )
 
 from .constants import CONTENT_TYPE
-from .media import MediaHandler
+from .files import NOT_MODIFIED_HEADERS, FileResponse, is_not_modified
+from .media import MediaHandler, stream_media
 
 AnyStr = Union[str, bytes]
 BackgroundFunc = Callable[..., Coroutine]
@@ -54,6 +56,9 @@ class Response:
     request (Request): the currently processed request.
     media_type (str): the configured media type (given by the `App`).
     media_handler (callable): the configured media handler (given by the `App`).
+    auto_etag (bool):
+        whether to compute an ETag from the content (given by the `App`).
+        Defaults to `False`.
 
     # Attributes
     content (bytes or str): the raw response content.
@@ -67,13 +72,28 @@ class Response:
         This is done by setting the [Content-Disposition] header, and
         typically makes the client browser trigger a "Save As…" dialog or
         download and save the file locally.
+    auto_etag (bool):
+        if `True`, a strong [ETag] is computed by hashing the `content`, and
+        an empty `304 Not Modified` response is sent if it matches the
+        `If-None-Match` request header.
+        Only applies to `200` responses to `GET` and `HEAD` requests.
+    etag (str):
+        an optional version key for the content, sent as a weak [ETag]
+        (unless it is already quoted) and used for `304 Not Modified`
+        responses as for `auto_etag`, without hashing the content.
+
+    [ETag]: https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/ETag
     """
 
     text = _content_setter(CONTENT_TYPE.PLAIN_TEXT)
     html = _content_setter(CONTENT_TYPE.HTML)
 
     def __init__(
-        self, request: Request, media_type: str, media_handler: MediaHandler
+        self,
+        request: Request,
+        media_type: str,
+        media_handler: MediaHandler,
+        auto_etag: bool = False,
     ):
         # Public attributes.
         self.content: Optional[AnyStr] = None
@@ -82,6 +102,8 @@ class Response:
         self.headers: Dict[str, str] = {}
         self.chunked = False
         self.attachment: Optional[str] = None
+        self.auto_etag = auto_etag
+        self.etag: Optional[str] = None
         # Private attributes.
         self._file_path: Optional[str] = None
         self._media_type = media_type
@@ -102,10 +124,35 @@ class Response:
         self.content = self._media_handler(value)
         self.headers["content-type"] = self._media_type
 
+    def media_stream(
+        self, values: Union[Iterable, AsyncIterable], ndjson: bool = False
+    ):
+        """Stream a sequence of values serialized using the `media_handler`.
+
+        Values are serialized and sent incrementally, which keeps memory
+        usage low and reduces the time to first byte for large payloads.
+
+        # Parameters
+        values (iterable or async iterable):
+            The values to send, e.g. rows fetched from a database.
+        ndjson (bool, optional):
+            If `True`, values are sent as newline-delimited JSON with the
+            `application/x-ndjson` content type.
+            Otherwise, they are sent as the items of a JSON array with the
+            content type set to the `media_type`.
+            Defaults to `False`.
+        """
+        self.headers["content-type"] = (
+            CONTENT_TYPE.NDJSON if ndjson else self._media_type
+        )
+        self._stream = stream_media(values, self._media_handler, ndjson=ndjson)
+
     def file(self, path: str, attach: bool = True):
-        """Send a file asynchronously using [aiofiles].
+        """Send a file asynchronously.
 
-        [aiofiles]: https://github.com/Tinche/aiofiles
+        Conditional requests (`If-None-Match`, `If-Modified-Since`) and
+        range requests (`Range`, `If-Range`) are supported, which allows
+        clients to re-validate cached files and to resume downloads.
 
         # Parameters
         path (str):
@@ -155,12 +202,27 @@ class Response:
         self._stream = func()
         return func
 
+    def _get_etag(self) -> Optional[str]:
+        if self.etag is not None:
+            if self.etag.startswith(('"', 'W/"')):
+                return self.etag
+            return f'W/"{self.etag}"'
+
+        if self.auto_etag and self.content is not None:
+            content = self.content
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            return f'"{blake2b(content, digest_size=16).hexdigest()}"'
+
+        return None
+
     async def __call__(self, receive, send):
         """Build and send the response."""
         if self.status_code is None:
             self.status_code = 200
 
-        if self.status_code != 204:
+        if self.status_code != 204 and self._file_path is None:
+            # NOTE: the content type of files is guessed from their name.
             self.headers.setdefault("content-type", "text/plain")
 
         if self.chunked:
@@ -170,6 +232,36 @@ class Response:
             disposition = f"attachment; filename='{self.attachment}'"
             self.headers.setdefault("content-disposition", disposition)
 
+        if self._file_path is not None:
+            # `FileResponse` determines the status code itself (e.g. 206
+            # for range requests).
+            file_response = FileResponse(
+                self._file_path,
+                method=self.request.method,
+                request_headers=self.request.headers,
+                headers=self.headers,
+                background=self._background_task,
+            )
+            await file_response(receive, send)
+            return
+
+        if (
+            self._stream is None
+            and self.status_code == 200
+            and self.request.method in ("GET", "HEAD")
+        ):
+            etag = self._get_etag()
+            if etag is not None:
+                self.headers["etag"] = etag
+                if is_not_modified(self.request.headers, etag):
+                    self.status_code = 304
+                    self.content = b""
+                    self.headers = {
+                        key: value
+                        for key, value in self.headers.items()
+                        if key in NOT_MODIFIED_HEADERS
+                    }
+
         response_kwargs = {
             "content": self.content,
             "headers": self.headers,
@@ -179,15 +271,7 @@ class Response:
 
         response_cls = _Response
 
-        if self._file_path is not None:
-            response_cls = _FileResponse
-            response_kwargs["path"] = self._file_path
-            # `FileResponse` will populate the response from `path` and
-            # doesn't expect `content` to be passed.
-            del response_kwargs["content"]
-            # `FileResponse` will set the status code to 200.
-            del response_kwargs["status_code"]
-        elif self._stream is not None:
+        if self._stream is not None:
             response_cls = _StreamingResponse
             response_kwargs["content"] = self._stream
 
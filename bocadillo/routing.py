@@ -11,11 +11,16 @@ This modules uses the following [generic types]:
 """
 
 import inspect
+import warnings
+from collections import OrderedDict
+from time import perf_counter
 from typing import (
     Any,
     Callable,
     Dict,
     Generic,
+    List,
+    NamedTuple,
     NoReturn,
     Optional,
     Tuple,
@@ -28,12 +33,18 @@ from starlette.websockets import WebSocketClose
 from . import views
 from .app_types import HTTPApp, Receive, Scope, Send
 from .errors import HTTPError
+from .broadcast import Broadcast
+from .json_engines import JSONEngine, StdlibEngine
 from .redirection import Redirection
 from .request import Request
 from .response import Response
 from .views import AsyncHandler, HandlerDoesNotExist, View
 from .websockets import WebSocket, WebSocketView
 
+# Synchronous handlers running on the event loop for longer than this
+# (in seconds) are reported in debug mode.
+INLINE_BLOCKING_THRESHOLD = 0.1
+
 WILDCARD = "{}"
 
 # Route generic types.
@@ -104,16 +115,162 @@ class RouteMatch(Generic[_R]):  # pylint: disable=unsubscriptable-object
         self.params = params
 
 
+def _split_path(path: str) -> Optional[List[str]]:
+    # Split an URL path (or pattern) into lowercased segments.
+    # NOTE: parse matches case-insensitively, so static segments are
+    # compared in lowercase too.
+    if not path.startswith("/"):
+        return None
+    return path[1:].lower().split("/")
+
+
+def _is_static(segment: str) -> bool:
+    return "{" not in segment and "}" not in segment
+
+
+class _RouteNode:
+    # A node of the route tree. Static children are indexed by segment,
+    # and `routes` holds `(index, route)` pairs whose static prefix
+    # ends at this node.
+
+    __slots__ = ("children", "routes")
+
+    def __init__(self):
+        self.children: Dict[str, "_RouteNode"] = {}
+        self.routes: List[Tuple[int, Any]] = []
+
+
+class _RouteTree(Generic[_R]):
+    # Compiled, segment-based lookup structure for a list of routes.
+    #
+    # Routes without any field (e.g. `/health`) are stored in an exact-match
+    # dict. Other routes are stored at the node reached by following the
+    # static segments at the start of their pattern. Matching a path walks
+    # the tree segment by segment with dict lookups, which yields the few
+    # routes that may match. Those candidates are then checked with their
+    # precompiled parsers, in registration order, so that route precedence
+    # and parameter semantics are exactly those of a linear scan.
+
+    def __init__(self, routes: List[_R]):
+        self._root = _RouteNode()
+        self._static: Dict[str, Tuple[int, _R]] = {}
+        for index, route in enumerate(routes):
+            self._insert(index, route)
+
+    def _insert(self, index: int, route: _R):
+        if _is_static(route.pattern):
+            # First registered wins, as with a linear scan.
+            self._static.setdefault(route.pattern.lower(), (index, route))
+            return
+
+        node = self._root
+        for segment in _split_path(route.pattern) or []:
+            if not _is_static(segment):
+                break
+            node = node.children.setdefault(segment, _RouteNode())
+        node.routes.append((index, route))
+
+    def _candidates(self, path: str) -> List[Tuple[int, _R]]:
+        node = self._root
+        found: List[Tuple[int, _R]] = list(node.routes)
+        for segment in _split_path(path) or []:
+            child = node.children.get(segment)
+            if child is None:
+                break
+            node = child
+            found.extend(node.routes)
+        if len(found) > 1:
+            found.sort(key=lambda item: item[0])
+        return found
+
+    def match(self, path: str) -> Optional[Tuple[_R, dict]]:
+        static = self._static.get(path.lower())
+
+        for index, route in self._candidates(path):
+            if static is not None and index > static[0]:
+                # The static route was registered first.
+                break
+            params = route.parse(path)
+            if params is not None:
+                return route, params
+
+        if static is not None:
+            return static[1], {}
+
+        return None
+
+
+class CacheInfo(NamedTuple):
+    """Statistics about a router's match cache.
+
+    # Attributes
+    hits (int): number of paths resolved from the cache.
+    misses (int): number of paths that had to be matched against routes.
+    maxsize (int): maximum number of cached paths.
+    currsize (int): current number of cached paths.
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 class BaseRouter(Generic[_R, _V]):
     """The base router class.
 
+    Routes are compiled into a segment-based tree, which is (re)built lazily
+    the first time a path is matched after a route was added. Routes
+    without parameters are resolved with a single dict lookup.
+
+    # Parameters
+    cache_size (int):
+        Maximum number of URL paths whose match is kept in an LRU cache.
+        Defaults to `0` (no caching).
+
     # Attributes
     routes (dict):
         A mapping of URL patterns to route objects.
+        Routes should be registered through [`.add()`](#add) so that
+        compiled lookup structures and the match cache are invalidated.
     """
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 0):
         self.routes: Dict[str, _R] = {}
+        self._tree: Optional[_RouteTree[_R]] = None
+        self._cache: "OrderedDict[str, Tuple[_R, dict]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    @property
+    def cache_size(self) -> int:
+        """Maximum number of entries in the match cache (`0` disables it)."""
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, size: int):
+        assert size >= 0, "cache size must be positive"
+        self._cache_size = size
+        self.cache_clear()
+
+    def cache_info(self) -> CacheInfo:
+        """Return statistics about the match cache.
+
+        # Returns
+        info (CacheInfo): hits, misses, maximum and current size.
+        """
+        return CacheInfo(
+            hits=self._cache_hits,
+            misses=self._cache_misses,
+            maxsize=self._cache_size,
+            currsize=len(self._cache),
+        )
+
+    def cache_clear(self) -> None:
+        """Empty the match cache and reset its statistics."""
+        self._cache.clear()
+        self._cache_hits = self._cache_misses = 0
 
     def _get_key(self, route: _R) -> str:
         # Return the key at which `route` should be stored internally.
@@ -132,6 +289,8 @@ class BaseRouter(Generic[_R, _V]):
 
     def add(self, route: _R) -> None:
         self.routes[self._get_key(route)] = route
+        self._tree = None
+        self.cache_clear()
 
     def route(self, *args, **kwargs) -> Callable[[Any], _R]:
         """Register a route by decorating a view.
@@ -163,11 +322,32 @@ class BaseRouter(Generic[_R, _V]):
             a [`RouteMatch`](#routematch) object if the path matched
             a registered route, `None` otherwise.
         """
-        for route in self.routes.values():
-            params = route.parse(path)
-            if params is not None:
-                return RouteMatch(route=route, params=params)
-        return None
+        if self._cache_size:
+            cached = self._cache.get(path)
+            if cached is not None:
+                self._cache.move_to_end(path)
+                self._cache_hits += 1
+                route, params = cached
+                return RouteMatch(route=route, params=dict(params))
+            self._cache_misses += 1
+
+        if self._tree is None:
+            self._tree = _RouteTree(list(self.routes.values()))
+
+        result = self._tree.match(path)
+        if result is None:
+            # NOTE: unmatched paths are not cached so that scanning
+            # random URLs does not evict hot entries.
+            return None
+
+        route, params = result
+
+        if self._cache_size:
+            self._cache[path] = (route, dict(params))
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return RouteMatch(route=route, params=params)
 
 
 # HTTP.
@@ -184,19 +364,27 @@ class HTTPRoute(BaseRoute[View]):
         A `View` object.
     name (str):
         The route's name.
+    etags (bool):
+        If given, overrides the application's `enable_etags` setting
+        for this route.
     """
 
-    def __init__(self, pattern: str, view: View, name: str):
+    def __init__(self, pattern: str, view: View, name: str, etags: bool = None):
         super().__init__(pattern, view)
         self.name = name
+        self.etags = etags
 
     async def __call__(self, req: Request, res: Response, **params):
-        method: str = req.method.lower()
+        if self.etags is not None:
+            res.auto_etag = self.etags
 
-        try:
-            handler: AsyncHandler = self.view.get_handler(method)
-        except HandlerDoesNotExist as e:
-            raise HTTPError(405) from e
+        handler: Optional[AsyncHandler] = self.view.handlers.get(req.method)
+        if handler is None:
+            try:
+                handler = self.view.get_handler(req.method)
+            except HandlerDoesNotExist as e:
+                res.headers["allow"] = self.view.allow
+                raise HTTPError(405) from e
 
         await handler(req, res, **params)  # type: ignore
 
@@ -207,8 +395,22 @@ class HTTPRouter(HTTPApp, BaseRouter[HTTPRoute, View]):
     Subclass of [BaseRouter](#baserouter).
 
     Note: routes are stored by `name` instead of `pattern`.
+
+    # Attributes
+    debug (bool):
+        if `True`, a `RuntimeWarning` is issued when a synchronous handler
+        which runs directly on the event loop (see [View](./views.md#view))
+        blocks it for longer than `blocking_threshold`.
+        Set by the `App` in debug mode.
+    blocking_threshold (float):
+        a duration in seconds. Defaults to `INLINE_BLOCKING_THRESHOLD` (0.1).
     """
 
+    def __init__(self, cache_size: int = 0):
+        super().__init__(cache_size=cache_size)
+        self.debug = False
+        self.blocking_threshold = INLINE_BLOCKING_THRESHOLD
+
     def _get_key(self, route: HTTPRoute) -> str:
         # NOTE: this ensures that no two routes stored in this
         # router have the same name.
@@ -256,6 +458,7 @@ class HTTPRouter(HTTPApp, BaseRouter[HTTPRoute, View]):
         pattern: str,
         name: str = None,
         namespace: str = None,
+        etags: bool = None,
         **kwargs,
     ) -> HTTPRoute:
         """Register an HTTP route.
@@ -267,6 +470,7 @@ class HTTPRouter(HTTPApp, BaseRouter[HTTPRoute, View]):
         pattern (str): an URL pattern.
         name (str): a route name (inferred from the view if not given).
         namespace (str): an optional route namespace.
+        etags (bool): see [HTTPRoute](#httproute).
 
         # Returns
         route (HTTPRoute): the registered route.
@@ -276,7 +480,7 @@ class HTTPRouter(HTTPApp, BaseRouter[HTTPRoute, View]):
         if namespace is not None:
             name = namespace + ":" + name
 
-        route = HTTPRoute(pattern=pattern, view=view, name=name)
+        route = HTTPRoute(pattern=pattern, view=view, name=name, etags=etags)
         self.add(route)
 
         return route
@@ -287,11 +491,26 @@ class HTTPRouter(HTTPApp, BaseRouter[HTTPRoute, View]):
         if match is None:
             raise HTTPError(status=404)
 
+        route = match.route
+        watch = self.debug and req.method in route.view.inline
+        start = perf_counter() if watch else 0.0
+
         try:
-            await match.route(req, res, **match.params)
+            await route(req, res, **match.params)
         except Redirection as redirection:
             res = redirection.response
 
+        if watch:
+            elapsed = perf_counter() - start
+            if elapsed > self.blocking_threshold:
+                warnings.warn(
+                    f"Non-blocking handler of view '{route.view.name}' "
+                    f"blocked the event loop for {elapsed:.3f}s "
+                    f"({req.method} {req.url.path}). Consider removing "
+                    "`blocking=False` or making it asynchronous.",
+                    RuntimeWarning,
+                )
+
         return res
 
 
@@ -326,14 +545,29 @@ class WebSocketRoute(BaseRoute[WebSocketView]):
         except BaseException:
             await ws.ensure_closed(1011)
             raise
+        finally:
+            await ws.unsubscribe()
 
 
 class WebSocketRouter(BaseRouter[WebSocketRoute, WebSocketView]):
     """A router for WebSocket routes.
 
     Subclass of [BaseRouter](#baserouter).
+
+    # Attributes
+    json_engine (JSONEngine):
+        the JSON engine given to the `WebSocket` objects of routes
+        registered from now on, unless specified otherwise.
+    broadcast (Broadcast):
+        the broadcast hub given to the `WebSocket` objects of routes
+        registered from now on, unless specified otherwise.
     """
 
+    def __init__(self, cache_size: int = 0):
+        super().__init__(cache_size=cache_size)
+        self.json_engine: JSONEngine = StdlibEngine()
+        self.broadcast = Broadcast(json_engine=self.json_engine)
+
     def _get_key(self, route: WebSocketRoute) -> str:
         return route.pattern
 
@@ -349,6 +583,8 @@ class WebSocketRouter(BaseRouter[WebSocketRoute, WebSocketView]):
         # Returns
         route (WebSocketRoute): the registered route.
         """
+        kwargs.setdefault("json_engine", self.json_engine)
+        kwargs.setdefault("broadcast", self.broadcast)
         route = WebSocketRoute(pattern=pattern, view=view, **kwargs)
         self.add(route)
         return route
@@ -372,7 +608,14 @@ class RoutingMixin:
         self.http_router = HTTPRouter()
         self.websocket_router = WebSocketRouter()
 
-    def route(self, pattern: str, *, name: str = None, namespace: str = None):
+    def route(
+        self,
+        pattern: str,
+        *,
+        name: str = None,
+        namespace: str = None,
+        etags: bool = None,
+    ):
         """Register a new route by decorating a view.
 
         # Parameters
@@ -388,9 +631,13 @@ class RoutingMixin:
         namespace (str):
             An optional namespace for the route. If given, it is prefixed to
             the name and separated by a colon.
+        etags (bool):
+            If given, enables or disables ETags and automatic
+            `304 Not Modified` responses for this route, regardless of
+            the application's `enable_etags` setting.
         """
         return self.http_router.route(
-            pattern=pattern, name=name, namespace=namespace
+            pattern=pattern, name=name, namespace=namespace, etags=etags
         )
 
     def websocket_route(
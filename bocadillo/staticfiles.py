@@ -1,27 +1,530 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from collections import OrderedDict
+from email.utils import formatdate
+from functools import partial
+from io import BytesIO
 from os.path import exists
+from typing import (
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers as StarletteHeaders
 from whitenoise import WhiteNoise
 
+from .app_types import ASGIApp, ASGIAppInstance, Receive, Scope, Send
 from .compat import WSGIApp, empty_wsgi_app
+from .files import NOT_MODIFIED_HEADERS, get_etag, is_not_modified
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
 
-def static(directory: str) -> WSGIApp:
-    """Return a WSGI app that serves static files under the given directory.
+Headers = List[Tuple[bytes, bytes]]
 
-    Powered by WhiteNoise.
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+# Precompressed versions of a file are looked for next to it, and served
+# to clients that accept them, by order of preference.
+SIDECAR_EXTENSIONS = (("br", ".br"), ("gzip", ".gz"))
+
+MANIFEST_NAME = "staticfiles.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticFile(NamedTuple):
+    """An entry of the index of a `StaticFiles` app.
+
+    # Attributes
+    path (str): the absolute path to the file on disk.
+    size (int): the file size, in bytes.
+    headers (list): pre-encoded response headers.
+    etag (str): the file's entity tag.
+    last_modified (float): the file's modification timestamp.
+    alternates (tuple):
+        `(encoding, static_file)` pairs for precompressed versions of the
+        file, by order of preference.
+    """
+
+    path: str
+    size: int
+    headers: Headers
+    etag: str
+    last_modified: float
+    alternates: Tuple[Tuple[str, "StaticFile"], ...] = ()
+
+
+class StaticFiles(ASGIApp):
+    """An ASGI app that serves static files under the given directory.
+
+    The directory is indexed when the app is created: files added or modified
+    afterwards are not picked up until [refresh()](#refresh) is called.
+
+    Conditional requests are supported through the `ETag` and
+    `Last-Modified` headers. Small files are kept in memory in an LRU cache,
+    and larger files are sent using the [zero-copy send] extension when the
+    server supports it, or streamed in chunks otherwise.
+
+    If a `.br` or `.gz` file exists next to a file, it is served instead to
+    clients that accept the corresponding `Content-Encoding`. Files listed
+    as hashed files in a manifest generated by
+    [compress_static()](#compress-static) are served with a far-future
+    `Cache-Control` header.
+
+    [zero-copy send]: https://asgi.readthedocs.io/en/latest/extensions.html#zero-copy-send
 
     # Parameters
     directory (str):
         the path to a directory from where static files should be served.
         If the directory does not exist, no files will be served.
+    max_age (int):
+        if given, a `Cache-Control: max-age=...` header is added to
+        responses.
+    cache_max_bytes (int):
+        the total size of file contents kept in memory. Defaults to 8 MiB.
+    cache_max_file_size (int):
+        files larger than this are never kept in memory. Defaults to 64 KiB.
+    chunk_size (int):
+        size of chunks when streaming files. Defaults to 64 KiB.
+
+    # Attributes
+    manifest (dict):
+        maps file names to their hashed names, as read from the manifest.
+        Empty if there is no manifest.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_age: Optional[int] = None,
+        cache_max_bytes: int = 8 * 1024 * 1024,
+        cache_max_file_size: int = 64 * 1024,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.directory = directory
+        self.max_age = max_age
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_max_file_size = cache_max_file_size
+        self.chunk_size = chunk_size
+        self.manifest: Dict[str, str] = {}
+        self._files: Dict[str, StaticFile] = {}
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self.refresh()
+
+    def refresh(self):
+        """(Re)build the index of files and clear the in-memory cache."""
+        files: Dict[str, StaticFile] = {}
+        self.manifest = {}
+
+        if exists(self.directory):
+            self.manifest = read_manifest(self.directory)
+            immutable = set(self.manifest.values())
+
+            for root, _, filenames in os.walk(self.directory):
+                for filename in filenames:
+                    path = os.path.join(root, filename)
+                    name = os.path.relpath(path, self.directory)
+                    name = name.replace(os.sep, "/")
+                    files["/" + name] = self._get_static_file(
+                        path, immutable=name in immutable
+                    )
+
+        self._files = files
+        self._cache.clear()
+        self._cache_bytes = 0
+
+    def _get_static_file(
+        self, path: str, immutable: bool = False
+    ) -> StaticFile:
+        content_type, encoding = mimetypes.guess_type(path)
+        if content_type is None or encoding is not None:
+            # NOTE: compressed files (e.g. `.tar.gz`) are sent as-is.
+            content_type = "application/octet-stream"
+
+        headers = {"content-type": content_type}
+        if immutable:
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        elif self.max_age is not None:
+            headers["cache-control"] = f"max-age={self.max_age}, public"
+
+        alternates = tuple(
+            (
+                encoding,
+                _stat_static_file(
+                    path + extension,
+                    {
+                        **headers,
+                        "content-encoding": encoding,
+                        "vary": "Accept-Encoding",
+                    },
+                ),
+            )
+            for encoding, extension in SIDECAR_EXTENSIONS
+            if exists(path + extension)
+        )
+        if alternates:
+            headers["vary"] = "Accept-Encoding"
+
+        return _stat_static_file(path, headers, alternates)
+
+    def __call__(self, scope: Scope) -> ASGIAppInstance:
+        return partial(self.asgi, scope=scope)
+
+    async def asgi(self, receive: Receive, send: Send, scope: Scope):
+        if scope["method"] not in ("GET", "HEAD"):
+            await _send_text(send, 405, b"Method Not Allowed", allow=True)
+            return
+
+        static_file = self._files.get(scope["path"])
+        if static_file is None:
+            await _send_text(send, 404, b"Not Found")
+            return
+
+        request_headers = StarletteHeaders(scope=scope)
+
+        if static_file.alternates:
+            static_file = _negotiate_encoding(request_headers, static_file)
+
+        if is_not_modified(
+            request_headers, static_file.etag, static_file.last_modified
+        ):
+            headers = [
+                h for h in static_file.headers if h[0] in _NOT_MODIFIED_HEADERS
+            ]
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": headers,
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": static_file.headers,
+            }
+        )
+
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif static_file.size <= self.cache_max_file_size:
+            body = await self._get_cached_content(static_file)
+            await send({"type": "http.response.body", "body": body})
+        elif ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            await self._send_zerocopy(send, static_file)
+        else:
+            await self._send_chunked(send, static_file)
+
+    async def _get_cached_content(self, static_file: StaticFile) -> bytes:
+        body = self._cache.get(static_file.path)
+        if body is not None:
+            self._cache.move_to_end(static_file.path)
+            return body
+
+        body = await run_in_threadpool(_read_file, static_file.path)
+        # NOTE: concurrent requests may have cached the file meanwhile.
+        previous = self._cache.pop(static_file.path, None)
+        if previous is not None:
+            self._cache_bytes -= len(previous)
+        self._cache[static_file.path] = body
+        self._cache_bytes += len(body)
+        while self._cache_bytes > self.cache_max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+        return body
+
+    async def _send_zerocopy(self, send: Send, static_file: StaticFile):
+        with open(static_file.path, "rb") as f:
+            await send(
+                {
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": f,
+                    "count": static_file.size,
+                }
+            )
+
+    async def _send_chunked(self, send: Send, static_file: StaticFile):
+        with open(static_file.path, "rb") as f:
+            more_body = True
+            while more_body:
+                chunk = await run_in_threadpool(f.read, self.chunk_size)
+                more_body = len(chunk) == self.chunk_size
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+
+
+_NOT_MODIFIED_HEADERS = {key.encode() for key in NOT_MODIFIED_HEADERS}
+
+
+def _encode_headers(headers: Dict[str, str]) -> Headers:
+    return [
+        (key.encode("latin-1"), value.encode("latin-1"))
+        for key, value in headers.items()
+    ]
+
+
+def _stat_static_file(
+    path: str,
+    headers: Dict[str, str],
+    alternates: Tuple[Tuple[str, StaticFile], ...] = (),
+) -> StaticFile:
+    stat = os.stat(path)
+    etag = get_etag(stat)
+    headers = {
+        **headers,
+        "content-length": str(stat.st_size),
+        "last-modified": formatdate(stat.st_mtime, usegmt=True),
+        "etag": etag,
+    }
+    return StaticFile(
+        path=path,
+        size=stat.st_size,
+        headers=_encode_headers(headers),
+        etag=etag,
+        last_modified=stat.st_mtime,
+        alternates=alternates,
+    )
+
+
+def _negotiate_encoding(
+    headers: Mapping[str, str], static_file: StaticFile
+) -> StaticFile:
+    accept_encoding = headers.get("accept-encoding")
+    if not accept_encoding:
+        return static_file
+
+    accepted = set()
+    refused = set()
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        key, _, value = params.strip().partition("=")
+        if key.strip().lower() == "q":
+            try:
+                if float(value) == 0:
+                    # NOTE: an explicit refusal takes precedence over `*`.
+                    refused.add(name)
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name)
+
+    for encoding, alternate in static_file.alternates:
+        if encoding in refused:
+            continue
+        if encoding in accepted or "*" in accepted:
+            return alternate
+    return static_file
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def _send_text(send: Send, status: int, body: bytes, allow=False):
+    headers = [
+        (b"content-type", b"text/plain"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    if allow:
+        headers.append((b"allow", b"GET, HEAD"))
+    await send(
+        {"type": "http.response.start", "status": status, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+# Extensions of files that are already compressed.
+INCOMPRESSIBLE_EXTENSIONS = {
+    ".br",
+    ".bz2",
+    ".gif",
+    ".gz",
+    ".ico",
+    ".jpeg",
+    ".jpg",
+    ".mp3",
+    ".mp4",
+    ".ogg",
+    ".png",
+    ".webm",
+    ".webp",
+    ".woff",
+    ".woff2",
+    ".xz",
+    ".zip",
+}
+
+
+def read_manifest(directory: str) -> Dict[str, str]:
+    """Read the manifest of a directory processed by `compress_static()`.
 
     # Returns
-    app (WSGIApp): a WSGI-compliant application.
+    manifest (dict):
+        maps file names (relative to `directory`) to their hashed names.
+        Empty if the manifest does not exist.
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["paths"]
+
+
+def _compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # NOTE: use a fixed mtime so that output is reproducible.
+        # `gzip.compress()` only accepts `mtime` on Python 3.8+.
+        buffer = BytesIO()
+        with gzip.GzipFile(
+            fileobj=buffer, mode="wb", compresslevel=9, mtime=0
+        ) as f:
+            f.write(content)
+        return buffer.getvalue()
+    assert encoding == "br", f"Unsupported encoding: {encoding}"
+    if brotli is None:  # pragma: no cover
+        raise ImportError(
+            "brotli must be installed to compress files with Brotli"
+        )
+    return brotli.compress(content)
+
+
+def compress_static(
+    directory: str,
+    encodings: Sequence[str] = None,
+    hash_names: bool = True,
+    min_size: int = 256,
+) -> Dict[str, str]:
+    """Prepare a static files directory for efficient serving.
+
+    This is meant to be run as a build step, before deploying the app.
+
+    For each file in `directory`:
+
+    - If `hash_names` is true, a copy whose name contains a hash of the
+    file contents is created, e.g. `js/app.3f2a1b9c0d4e.js`.
+    - Compressed versions of the file (and of its hashed copy) are written
+    next to it, e.g. `js/app.js.gz` and `js/app.js.br`. Files that are
+    smaller than `min_size`, already compressed or that do not compress well
+    are skipped.
+
+    If `hash_names` is true, a `staticfiles.json` manifest which maps file
+    names to hashed names is written at the root of `directory`.
+
+    # Parameters
+    directory (str): the static files directory.
+    encodings (list of str):
+        encodings to compress files with, among `"gzip"` and `"br"`.
+        Defaults to gzip, and Brotli if the `brotli` package is installed.
+    hash_names (bool): whether to create hashed copies of files.
+    min_size (int): minimum size of compressed files, in bytes.
+
+    # Returns
+    manifest (dict):
+        maps file names (relative to `directory`) to their hashed names.
+    """
+    if encodings is None:
+        encodings = ["gzip"] if brotli is None else ["br", "gzip"]
+    extensions = dict(SIDECAR_EXTENSIONS)
+
+    previous = read_manifest(directory)
+    generated = set(previous.values())
+    manifest: Dict[str, str] = {}
+
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, directory).replace(os.sep, "/")
+            base, ext = os.path.splitext(name)
+
+            if name == MANIFEST_NAME or name in generated:
+                continue
+            if ext in (".br", ".gz") and exists(os.path.join(directory, base)):
+                # Compressed version of another file.
+                continue
+
+            with open(path, "rb") as f:
+                content = f.read()
+
+            names = [name]
+            if hash_names:
+                digest = hashlib.md5(content).hexdigest()[:12]
+                hashed_name = f"{base}.{digest}{ext}"
+                manifest[name] = hashed_name
+                names.append(hashed_name)
+                with open(os.path.join(directory, hashed_name), "wb") as f:
+                    f.write(content)
+
+            if ext in INCOMPRESSIBLE_EXTENSIONS or len(content) < min_size:
+                continue
+
+            for encoding in encodings:
+                compressed = _compress(content, encoding)
+                if len(compressed) > 0.95 * len(content):
+                    # Not worth it.
+                    continue
+                for target in names:
+                    target = os.path.join(directory, target)
+                    with open(target + extensions[encoding], "wb") as f:
+                        f.write(compressed)
+
+    if hash_names:
+        with open(os.path.join(directory, MANIFEST_NAME), "w") as f:
+            json.dump({"paths": manifest}, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+def static(
+    directory: str, backend: str = "whitenoise", **kwargs
+) -> Union[WSGIApp, ASGIApp]:
+    """Return an app that serves static files under the given directory.
+
+    # Parameters
+    directory (str):
+        the path to a directory from where static files should be served.
+        If the directory does not exist, no files will be served.
+    backend (str):
+        Either `"whitenoise"` (the default) to get a WSGI app powered by
+        WhiteNoise, or `"asgi"` to get a native [StaticFiles](#staticfiles)
+        ASGI app.
+    kwargs (any):
+        passed to `StaticFiles` if `backend` is `"asgi"`.
+
+    # Returns
+    app (WSGIApp or StaticFiles): a WSGI or ASGI application.
 
     # See Also
     - [WhiteNoise](http://whitenoise.evans.io)
     - [WSGI](https://wsgi.readthedocs.io)
     """
+    if backend == "asgi":
+        return StaticFiles(directory, **kwargs)
+
+    assert backend == "whitenoise", f"Unknown static files backend: {backend}"
     app = WhiteNoise(empty_wsgi_app())
     if exists(directory):
         app.add_files(directory)
@@ -1,12 +1,31 @@
 import inspect
 from functools import partial, wraps
-from typing import Any, cast, Dict, List, Optional, Type, Union
+from types import MappingProxyType
+from typing import (
+    Any,
+    cast,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    Union,
+)
 
 from .app_types import AsyncHandler, Handler
-from .compat import call_async, camel_to_snake
+from .compat import camel_to_snake, to_async
 from .constants import ALL_HTTP_METHODS
+from .executors import (
+    Executor,
+    ProcessExecutor,
+    call_process_function,
+    get_default_process_executor,
+    register_process_function,
+)
 
 MethodsParam = Union[List[str], all]  # type: ignore
+ExecutorParam = Union[Executor, ProcessExecutor, str]
 
 
 class HandlerDoesNotExist(Exception):
@@ -42,12 +61,28 @@ class View:
     # Attributes
 
     name (str): the name of the view.
+    handlers (mapping):
+        a read-only mapping of uppercase HTTP methods (e.g. `"GET"`)
+        to handlers, built when the view is created.
+    allow (str):
+        the value of the `Allow` header sent along with
+        `405 Method Not Allowed` responses, e.g. `"GET, HEAD"`.
+    inline (frozenset of str):
+        the uppercase HTTP methods whose handlers are synchronous but
+        run directly on the event loop (see `blocking` in
+        [from_handler](#from-handler)).
     """
 
     def __init__(self, name: str, doc: str = None):
         self.name = name
         if doc is not None:
             self.__doc__ = doc
+        self.handlers: Mapping[str, AsyncHandler] = MappingProxyType({})
+        self.allow = ""
+        self.inline: FrozenSet[str] = frozenset()
+        # Handler for methods not in `ALL_HTTP_METHODS`, if `.handle()`
+        # is defined.
+        self._fallback: Optional[AsyncHandler] = None
 
     get: AsyncHandler
     post: AsyncHandler
@@ -59,12 +94,19 @@ class View:
     handle: AsyncHandler
 
     @staticmethod
-    def _to_all_async(handlers: Dict[str, Handler]) -> Dict[str, AsyncHandler]:
+    def _to_all_async(
+        handlers: Dict[str, Handler],
+        blocking: bool = True,
+        executor: Executor = None,
+    ) -> Dict[str, AsyncHandler]:
         async_handlers: Dict[str, AsyncHandler] = {}
 
         for method, handler in handlers.items():
             if not inspect.iscoroutinefunction(handler):
-                handler = wraps(handler)(partial(call_async, handler))
+                if blocking:
+                    handler = to_async(handler, executor=executor)
+                else:
+                    handler = _run_inline(handler)
             async_handlers[method] = cast(AsyncHandler, handler)
 
         return async_handlers
@@ -75,8 +117,12 @@ class View:
         name: str,
         docstring: Optional[str],
         handlers: Dict[str, Handler],
+        blocking: bool = True,
+        executor: Executor = None,
     ) -> "View":
-        async_handlers: Dict[str, AsyncHandler] = cls._to_all_async(handlers)
+        async_handlers: Dict[str, AsyncHandler] = cls._to_all_async(
+            handlers, blocking=blocking, executor=executor
+        )
 
         copy_get_to_head = (
             "get" in async_handlers and "head" not in async_handlers
@@ -89,19 +135,111 @@ class View:
         for method, handler in async_handlers.items():
             setattr(vue, method, handler)
 
+        handle = async_handlers.get("handle")
+        if handle is not None:
+            table = {method: handle for method in ALL_HTTP_METHODS}
+            vue._fallback = handle
+        else:
+            table = {
+                method.upper(): handler
+                for method, handler in async_handlers.items()
+            }
+
+        vue.handlers = MappingProxyType(table)
+        # NOTE: list methods in a conventional order.
+        ordered = [method for method in ALL_HTTP_METHODS if method in table]
+        ordered += sorted(set(table) - set(ordered))
+        vue.allow = ", ".join(ordered)
+
+        if not blocking:
+            sync_methods = {
+                method.upper()
+                for method, handler in handlers.items()
+                if not inspect.iscoroutinefunction(handler)
+            }
+            if "HANDLE" in sync_methods:
+                sync_methods = set(table)
+            if "GET" in sync_methods and copy_get_to_head:
+                sync_methods.add("HEAD")
+            vue.inline = frozenset(sync_methods)
+
         return vue
 
     def get_handler(self, method: str) -> AsyncHandler:
-        try:
-            return getattr(self, "handle")
-        except AttributeError:
-            try:
-                return getattr(self, method)
-            except AttributeError as exc:
-                raise HandlerDoesNotExist from exc
+        """Return the handler for an HTTP method.
+
+        # Parameters
+        method (str): an HTTP method, e.g. `"GET"` (case-insensitive).
+
+        # Raises
+        HandlerDoesNotExist: if the view does not support the method.
+        """
+        handler = self.handlers.get(method.upper(), self._fallback)
+        if handler is None:
+            raise HandlerDoesNotExist
+        return handler
+
+
+def _run_inline(handler: Handler) -> AsyncHandler:
+    # Call a synchronous handler directly on the event loop.
+    @wraps(handler)
+    async def inline(*args, **kwargs):
+        return handler(*args, **kwargs)
+
+    return inline
+
+
+def _to_process_handler(
+    func: Handler, executor: ProcessExecutor, headers: List[str]
+) -> AsyncHandler:
+    # Run a pure function in a process executor and apply its result
+    # to the response.
+    if inspect.iscoroutinefunction(func):
+        raise TypeError(
+            f"{func.__name__} cannot be run in a process executor: "
+            "it must be a regular function."
+        )
+    key = register_process_function(func)
+    header_names = [name.lower() for name in headers]
+
+    @wraps(func)
+    async def run_in_process(req, res, **params):
+        body = await req.body()
+        selected = {
+            name: req.headers[name]
+            for name in header_names
+            if name in req.headers
+        }
+        result = await executor.run(
+            call_process_function, key, body, params, selected
+        )
+        _apply_process_result(res, result)
+
+    return run_in_process
+
+
+def _apply_process_result(res, result: Any):
+    if isinstance(result, tuple):
+        result, headers = result
+        res.headers.update(headers)
+    if result is None:
+        return
+    if isinstance(result, bytes):
+        res.content = result
+        res.headers.setdefault("content-type", "application/octet-stream")
+    elif isinstance(result, str):
+        res.text = result
+    else:
+        res.media = result
 
 
-def from_handler(handler: Handler, methods: MethodsParam = None) -> View:
+def from_handler(
+    handler: Handler,
+    methods: MethodsParam = None,
+    blocking: bool = True,
+    executor: ExecutorParam = None,
+    headers: List[str] = None,
+) -> View:
     """Convert a handler to a `View` instance.
 
     # Parameters
@@ -113,10 +251,31 @@ def from_handler(handler: Handler, methods: MethodsParam = None) -> View:
     methods (list of str):
         A list of supported HTTP methods. The `all` built-in can be used
         to support all HTTP methods. Defaults to `["get"]`.
+    blocking (bool):
+        Only applies if `handler` is a regular (synchronous) function.
+        If `True`, the handler is run in a thread pool so that it does not
+        block the event loop. If `False`, it is called directly on the
+        event loop, which avoids the cost of the thread handoff for
+        handlers that return quickly. Defaults to `True`.
+    executor (Executor, ProcessExecutor or str):
+        Only applies if `handler` is a regular function and `blocking`
+        is `True`. If given, the handler is run in this executor instead
+        of the default thread pool.
+        If a `ProcessExecutor` or `"process"` (the default process
+        executor) is given, `handler` is run in a child process as
+        `handler(body, params, headers)` and its result is applied
+        to the response (see the views guide).
+    headers (list of str):
+        Only applies to process executors: the names of the request
+        headers passed to the handler.
 
     # Returns
     view (View): a `View` instance.
 
+    # Raises
+    ValueError: if `executor` is an unknown string.
+    TypeError: if a process executor is given for a coroutine function.
+
     # See Also
     - The [constants](./constants.md) module for the list of all HTTP methods.
     """
@@ -126,24 +285,40 @@ def from_handler(handler: Handler, methods: MethodsParam = None) -> View:
         methods = ["handle"]
     else:
         methods = [m.lower() for m in methods]
+    if executor == "process":
+        executor = get_default_process_executor()
+    elif isinstance(executor, str):
+        raise ValueError(f"Unknown executor: {executor}")
+    if isinstance(executor, ProcessExecutor):
+        handler = _to_process_handler(handler, executor, headers or [])
+        executor = None
     handlers = {method: handler for method in methods}
-    return View.create(handler.__name__, handler.__doc__, handlers)
+    return View.create(
+        handler.__name__,
+        handler.__doc__,
+        handlers,
+        blocking=blocking,
+        executor=executor,
+    )
 
 
-def from_obj(obj: Any) -> View:
+def from_obj(obj: Any, executor: Executor = None) -> View:
     """Convert an object to a `View` instance.
 
     # Parameters
     obj (any):
         its handlers, snake-cased class name and docstring are copied
         onto the view.
+    executor (Executor):
+        if given, synchronous handlers are run in this executor instead
+        of the default thread pool.
 
     # Returns
     view (View): a `View` instance.
     """
     handlers = get_handlers(obj)
     name = camel_to_snake(obj.__class__.__name__)
-    return View.create(name, obj.__doc__, handlers)
+    return View.create(name, obj.__doc__, handlers, executor=executor)
 
 
 def get_handlers(obj: Any) -> Dict[str, Handler]:
@@ -169,9 +344,20 @@ def get_handlers(obj: Any) -> Dict[str, Handler]:
         return {method: handle for method in all_methods}
 
 
-def view(methods: MethodsParam = None):
+def view(
+    methods: MethodsParam = None,
+    blocking: bool = True,
+    executor: ExecutorParam = None,
+    headers: List[str] = None,
+):
     """Convert the decorated function to a proper `View` object.
 
     This decorator is a shortcut for [from_handler](#from-handler).
     """
-    return partial(from_handler, methods=methods)
+    return partial(
+        from_handler,
+        methods=methods,
+        blocking=blocking,
+        executor=executor,
+        headers=headers,
+    )
@@ -1,4 +1,12 @@
-from typing import Awaitable, Callable, Optional, Any, Union, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Optional,
+    Any,
+    Union,
+    Tuple,
+)
 
 from starlette.datastructures import URL
 from starlette.websockets import (
@@ -8,6 +16,12 @@ from starlette.websockets import (
 
 from .app_types import Event, Scope, Receive, Send
 from .constants import WEBSOCKET_CLOSE_CODES
+from .json_engines import JSONEngine, StdlibEngine
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .broadcast import Broadcast
+
+_stdlib_engine = StdlibEngine()
 
 
 class WebSocket:
@@ -27,6 +41,13 @@ class WebSocket:
     caught_close_codes (tuple of int):
         Close codes of `WebSocketDisconnect` exceptions that should be
         caught and silenced. Defaults to `(1000, 1001)`.
+    json_engine (JSONEngine):
+        The engine used to serialize and parse JSON messages.
+        Defaults to the standard library's `json` module.
+    broadcast (Broadcast):
+        The hub used by [subscribe()](#subscribe),
+        [unsubscribe()](#unsubscribe) and [publish()](#publish)
+        (given by the `App`).
     args (any):
         Passed to the underlying Starlette `WebSocket` object. This is
         typically the ASGI `scope`, `receive` and `send` objects.
@@ -44,6 +65,8 @@ class WebSocket:
         receive_type: Optional[str] = None,
         send_type: Optional[str] = None,
         caught_close_codes: Optional[Tuple[int, ...]] = None,
+        json_engine: Optional[JSONEngine] = None,
+        broadcast: Optional["Broadcast"] = None,
     ):
         # NOTE: we use composition over inheritance here, because
         # we want to redefine `receive()` and `send()` but Starlette's
@@ -66,6 +89,8 @@ class WebSocket:
 
         self.receive_type = receive_type
         self.send_type = send_type
+        self.json_engine = json_engine or _stdlib_engine
+        self.broadcast = broadcast
 
     @property
     def url(self) -> URL:
@@ -135,9 +160,9 @@ class WebSocket:
         """Receive a message as text and parse it to a JSON object.
 
         # Raises
-        json.JSONDecodeError: if the received JSON is invalid.
+        ValueError: if the received JSON is invalid.
         """
-        return await self._ws.receive_json()
+        return self.json_engine.loads(await self.receive_text())
 
     async def send_json(self, data: Union[dict, list]):
         """Serialize an object to JSON and send it as text.
@@ -145,7 +170,7 @@ class WebSocket:
         # Raises
         TypeError: if the given `data` is not JSON serializable.
         """
-        return await self._ws.send_json(data)
+        return await self.send_text(self.json_engine.dumps(data).decode())
 
     async def receive_event(self) -> Event:
         """Receive a raw ASGI event."""
@@ -171,6 +196,45 @@ class WebSocket:
         sender = getattr(self, f"send_{self.send_type}")
         return await sender(message)
 
+    # Publish/subscribe.
+
+    def _get_broadcast(self) -> "Broadcast":
+        if self.broadcast is None:
+            raise RuntimeError("This WebSocket has no broadcast hub.")
+        return self.broadcast
+
+    async def subscribe(self, *topics: str):
+        """Receive the messages published on the given topics.
+
+        Messages are sent to the client in the background.
+
+        # See Also
+        - [Broadcast](./broadcast.md#broadcast)
+        """
+        broadcast = self._get_broadcast()
+        for topic in topics:
+            await broadcast.subscribe(self, topic)
+
+    async def unsubscribe(self, *topics: str):
+        """Stop receiving the messages published on the given topics.
+
+        If no topic is given, unsubscribe from all topics.
+        """
+        if self.broadcast is None:
+            return
+        if not topics:
+            await self.broadcast.unsubscribe(self)
+        for topic in topics:
+            await self.broadcast.unsubscribe(self, topic)
+
+    async def publish(self, topic: str, message: Any):
+        """Publish a message on a topic.
+
+        The message is sent to all WebSockets subscribed to the topic,
+        including this one if subscribed.
+        """
+        await self._get_broadcast().publish(topic, message)
+
     # Asynchronous context manager.
 
     async def __aenter__(self, *args, **kwargs):
@@ -178,6 +242,8 @@ class WebSocket:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.unsubscribe()
+
         if exc_type == WebSocketDisconnect:
             # Client has closed the connection.
             # Returning `True` here silences the exception. See:
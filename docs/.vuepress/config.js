@@ -165,6 +165,7 @@ module.exports = {
             "media",
             "static-files",
             "hooks",
+            "caching",
             "background-tasks",
             "middleware"
           ])
@@ -178,6 +179,7 @@ module.exports = {
             "connections",
             "error-handling",
             "messages",
+            "broadcasting",
             "example"
           ])
         },
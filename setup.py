@@ -31,7 +31,7 @@ setuptools.setup(
         "python-multipart",
         "websockets>=6.0",
     ],
-    extras_require={"files": ["aiofiles"]},
+    extras_require={"files": ["aiofiles"], "brotli": ["brotli"]},
     url=DOCS,
     project_urls={
         "Source": GITHUB,
@@ -0,0 +1,205 @@
+import asyncio
+
+import pytest
+
+from bocadillo import App, WebSocket
+from bocadillo.broadcast import Broadcast, MemoryBackend
+
+
+class FakeWebSocket:
+    def __init__(self, gate: asyncio.Event = None, fail: bool = False):
+        self.gate = gate
+        self.fail = fail
+        self.sent = []
+        self.close_code = None
+
+    async def send_event(self, event: dict):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("Connection closed")
+        self.sent.append(event)
+
+    async def ensure_closed(self, code: int = 1000):
+        self.close_code = code
+
+
+async def _flush():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        Broadcast(policy="foo")
+
+
+@pytest.mark.asyncio
+async def test_message_is_serialized_once_and_fanned_out():
+    hub = Broadcast()
+    first, second, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await hub.subscribe(first, "chat")
+    await hub.subscribe(second, "chat")
+    await hub.subscribe(other, "news")
+    assert hub.subscribers("chat") == 2
+
+    await hub.publish("chat", {"message": "hello"})
+    await hub.publish("chat", b"\x00")
+    await _flush()
+
+    assert (
+        first.sent
+        == second.sent
+        == [
+            {"type": "websocket.send", "text": '{"message": "hello"}'},
+            {"type": "websocket.send", "bytes": b"\x00"},
+        ]
+    )
+    assert first.sent[0] is second.sent[0]
+    assert other.sent == []
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe():
+    backend = MemoryBackend()
+    hub = Broadcast(backend=backend)
+    ws = FakeWebSocket()
+    await hub.subscribe(ws, "chat")
+    await hub.subscribe(ws, "news")
+
+    await hub.unsubscribe(ws, "chat")
+    assert hub.subscribers("chat") == 0
+    assert backend._topics == {"news"}
+
+    await hub.publish("chat", "hello")
+    await hub.publish("news", "breaking")
+    await _flush()
+    assert ws.sent == [{"type": "websocket.send", "text": "breaking"}]
+
+    await hub.unsubscribe(ws)
+    assert hub.subscribers("news") == 0
+    assert backend._topics == set()
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy():
+    gate = asyncio.Event()
+    hub = Broadcast(queue_size=2, policy="drop_oldest")
+    ws = FakeWebSocket(gate=gate)
+    await hub.subscribe(ws, "chat")
+
+    for i in range(5):
+        await hub.publish("chat", str(i))
+    assert hub.dropped(ws) == 3
+
+    gate.set()
+    await _flush()
+    assert [event["text"] for event in ws.sent] == ["3", "4"]
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy():
+    hub = Broadcast(queue_size=1, policy="disconnect")
+    slow, fast = FakeWebSocket(gate=asyncio.Event()), FakeWebSocket()
+    await hub.subscribe(slow, "chat")
+    await hub.subscribe(fast, "chat")
+
+    for message in "123":
+        await hub.publish("chat", message)
+        await _flush()
+
+    assert slow.close_code == 1008
+    assert hub.subscribers("chat") == 1
+    assert [event["text"] for event in fast.sent] == ["1", "2", "3"]
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_block_policy():
+    gate = asyncio.Event()
+    hub = Broadcast(queue_size=1, policy="block")
+    ws = FakeWebSocket(gate=gate)
+    await hub.subscribe(ws, "chat")
+
+    await hub.publish("chat", "1")
+    await _flush()  # Writer is now waiting to send "1".
+    await hub.publish("chat", "2")
+    blocked = asyncio.ensure_future(hub.publish("chat", "3"))
+    await _flush()
+    assert not blocked.done()
+
+    gate.set()
+    await asyncio.wait_for(blocked, 1)
+    await _flush()
+    assert [event["text"] for event in ws.sent] == ["1", "2", "3"]
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_block_policy_releases_publisher_when_client_fails():
+    gate = asyncio.Event()
+    hub = Broadcast(queue_size=1, policy="block")
+    ws = FakeWebSocket(gate=gate, fail=True)
+    await hub.subscribe(ws, "chat")
+
+    await hub.publish("chat", "1")
+    await _flush()  # Writer is now waiting to send "1".
+    await hub.publish("chat", "2")
+    blocked = asyncio.ensure_future(hub.publish("chat", "3"))
+    await _flush()
+    assert not blocked.done()
+
+    gate.set()  # Sending "1" fails.
+    await asyncio.wait_for(blocked, 1)
+    assert hub.subscribers("chat") == 0
+    await asyncio.wait_for(hub.publish("chat", "4"), 1)
+
+
+@pytest.mark.asyncio
+async def test_block_policy_releases_publisher_on_unsubscribe():
+    hub = Broadcast(queue_size=1, policy="block")
+    ws = FakeWebSocket(gate=asyncio.Event())
+    await hub.subscribe(ws, "chat")
+
+    await hub.publish("chat", "1")
+    await _flush()
+    await hub.publish("chat", "2")
+    blocked = asyncio.ensure_future(hub.publish("chat", "3"))
+    await _flush()
+    assert not blocked.done()
+
+    await hub.unsubscribe(ws)
+    await asyncio.wait_for(blocked, 1)
+
+
+@pytest.mark.asyncio
+async def test_closed_connection_is_unsubscribed():
+    hub = Broadcast()
+    ws = FakeWebSocket(fail=True)
+    await hub.subscribe(ws, "chat")
+    await hub.publish("chat", "hello")
+    await _flush()
+    assert hub.subscribers("chat") == 0
+
+
+def test_websocket_subscribe_and_publish(app: App):
+    assert isinstance(app.broadcast, Broadcast)
+
+    @app.websocket_route("/chat/{room}")
+    async def chat(ws: WebSocket, room: str):
+        assert ws.broadcast is app.broadcast
+        async with ws:
+            await ws.subscribe(room)
+            message = await ws.receive()
+            await ws.publish(room, {"room": room, "message": message})
+            # NOTE: the test client blocks the event loop while waiting for
+            # a message, so let the message be sent before.
+            await asyncio.sleep(0.01)
+
+    with app.client.websocket_connect("/chat/tacos") as client:
+        client.send_text("hello")
+        assert client.receive_json() == {"room": "tacos", "message": "hello"}
+
+    assert app.broadcast.subscribers("tacos") == 0
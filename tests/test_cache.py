@@ -0,0 +1,630 @@
+import asyncio
+import time
+
+import pytest
+
+from bocadillo import App, HTTPError, Request, Response, hooks, view
+from bocadillo.cache import (
+    CachedResponse,
+    CacheServer,
+    CoalescingMiddleware,
+    MemoryBackend,
+    SocketBackend,
+    cached,
+)
+
+
+@pytest.fixture
+def backend() -> MemoryBackend:
+    return MemoryBackend()
+
+
+def test_cached_responses_skip_the_view(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.headers["x-calls"] = str(calls)
+        res.media = {"calls": calls}
+
+    for _ in range(3):
+        r = app.client.get("/")
+        assert r.status_code == 200
+        assert r.json() == {"calls": 1}
+        assert r.headers["x-calls"] == "1"
+        assert r.headers["content-type"] == "application/json"
+    assert calls == 1
+
+
+def test_sync_handler(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = "Hello"
+
+    assert app.client.get("/").text == "Hello"
+    assert app.client.get("/").text == "Hello"
+    assert calls == 1
+
+
+def test_key_includes_path_and_query_params(app: App, backend):
+    @app.route("/{name}")
+    @cached(backend=backend)
+    async def index(req, res, name):
+        res.text = name + req.query_params.get("q", "")
+
+    assert app.client.get("/foo").text == "foo"
+    assert app.client.get("/bar").text == "bar"
+    assert app.client.get("/foo?q=1").text == "foo1"
+    assert app.client.get("/foo?q=2").text == "foo2"
+    assert len(backend) == 4
+
+
+def test_selected_query_params(app: App, backend):
+    @app.route("/")
+    @cached(query_params=["page"], backend=backend)
+    async def index(req, res):
+        res.text = req.query_params.get("page", "") + req.query_params.get(
+            "utm", ""
+        )
+
+    assert app.client.get("/?page=1&utm=a").text == "1a"
+    assert app.client.get("/?page=1&utm=b").text == "1a"
+    assert app.client.get("/?page=2&utm=b").text == "2b"
+
+
+def test_vary_headers(app: App, backend):
+    @app.route("/")
+    @cached(vary=["Accept-Language"], backend=backend)
+    async def index(req, res):
+        res.text = req.headers.get("accept-language", "none")
+
+    r = app.client.get("/", headers={"accept-language": "fr"})
+    assert r.text == "fr"
+    assert r.headers["vary"] == "accept-language"
+    r = app.client.get("/", headers={"accept-language": "en"})
+    assert r.text == "en"
+    r = app.client.get("/", headers={"accept-language": "fr"})
+    assert r.text == "fr"
+    assert r.headers["vary"] == "accept-language"
+
+
+def test_ttl(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(ttl=0.01, backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    assert app.client.get("/").text == "1"
+    time.sleep(0.02)
+    assert app.client.get("/").text == "2"
+
+
+def test_only_successful_get_responses_are_cached(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    class Index:
+        async def get(self, req, res):
+            nonlocal calls
+            calls += 1
+            res.status_code = 201 if calls == 1 else 200
+            res.text = str(calls)
+
+        async def post(self, req, res):
+            nonlocal calls
+            calls += 1
+            res.text = str(calls)
+
+    assert app.client.get("/").status_code == 201
+    assert app.client.get("/").text == "2"
+    assert app.client.get("/").text == "2"
+    assert app.client.post("/").text == "3"
+    assert app.client.post("/").text == "4"
+
+
+def test_head_uses_get_response(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    class Index:
+        async def get(self, req, res):
+            nonlocal calls
+            calls += 1
+            res.text = "Hello"
+
+    assert app.client.get("/").text == "Hello"
+    assert app.client.head("/").status_code == 200
+    assert calls == 1
+
+
+def test_class_based_view_with_handle(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    class Index:
+        async def handle(self, req, res):
+            nonlocal calls
+            calls += 1
+            res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    assert app.client.get("/").text == "1"
+    assert app.client.put("/").text == "2"
+
+
+@pytest.mark.parametrize("methods", [["get"], ["get", "post"]])
+def test_cached_above_view(app: App, backend, methods):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    @view(methods=methods)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    assert app.client.get("/").text == "1"
+    assert app.client.head("/").status_code == 200
+    assert calls == 1
+    if "post" in methods:
+        assert app.client.post("/").text == "2"
+        assert app.client.post("/").text == "3"
+
+
+def test_responses_setting_cookies_are_not_cached(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.headers["set-cookie"] = f"session={calls}"
+        res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    r = app.client.get("/")
+    assert r.text == "2"
+    assert r.headers["set-cookie"] == "session=2"
+    assert len(backend) == 0
+
+
+@pytest.mark.parametrize("header", ["Accept-Language", "*"])
+def test_responses_varying_on_other_headers_are_not_cached(
+    app: App, backend, header
+):
+    @app.route("/")
+    @cached(vary=["accept-encoding"], backend=backend)
+    async def index(req, res):
+        res.headers["vary"] = header
+        res.text = req.headers["accept-language"]
+
+    for language in ("fr", "en"):
+        response = app.client.get("/", headers={"accept-language": language})
+        assert response.text == language
+    assert len(backend) == 0
+
+
+def test_responses_varying_on_vary_headers_are_cached(app: App, backend):
+    @app.route("/")
+    @cached(vary=["accept-language"], backend=backend)
+    async def index(req, res):
+        res.headers["vary"] = "Accept-Language"
+        res.text = req.headers["accept-language"]
+
+    for language in ("fr", "en", "fr"):
+        response = app.client.get("/", headers={"accept-language": language})
+        assert response.text == language
+    assert len(backend) == 2
+
+
+def test_streamed_responses_are_not_cached(app: App, backend):
+    @app.route("/")
+    @cached(backend=backend)
+    async def index(req, res):
+        @res.stream
+        async def stream():
+            yield "Hello"
+
+    assert app.client.get("/").text == "Hello"
+    assert app.client.get("/").text == "Hello"
+    assert len(backend) == 0
+
+
+def test_hooks_run_on_cached_responses(app: App, backend):
+    hook_calls = 0
+
+    def count(req, res, params):
+        nonlocal hook_calls
+        hook_calls += 1
+
+    @app.route("/")
+    @hooks.before(count)
+    @hooks.after(count)
+    @cached(backend=backend)
+    async def index(req, res):
+        res.text = "Hello"
+
+    app.client.get("/")
+    app.client.get("/")
+    assert hook_calls == 4
+
+
+def test_stale_while_revalidate(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(ttl=0.01, stale_ttl=60, backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    time.sleep(0.02)
+    # Stale response is sent, and refreshed in the background.
+    assert app.client.get("/").text == "1"
+    assert calls == 2
+    assert app.client.get("/").text == "2"
+
+    assert backend.stats.misses == 1
+    assert backend.stats.stale_hits == 1
+    assert backend.stats.hits == 1
+    assert backend.stats.refreshes == 1
+
+
+def test_stale_while_revalidate_with_after_hook(app: App, backend):
+    calls = 0
+
+    async def notify(req, res, params):
+        @res.background
+        async def send_notification():
+            pass
+
+    @app.route("/")
+    @hooks.after(notify)
+    @cached(ttl=0.05, stale_ttl=60, backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    time.sleep(0.06)
+    # The refresh still runs, although the hook replaced it as the
+    # background task of the response.
+    assert app.client.get("/").text == "1"
+    assert app.client.get("/").text == "2"
+    assert calls == 2
+    assert backend.stats.refreshes == 1
+
+
+def test_stale_responses_expire(app: App, backend):
+    calls = 0
+
+    @app.route("/")
+    @cached(ttl=0.01, stale_ttl=0.01, backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = str(calls)
+
+    assert app.client.get("/").text == "1"
+    time.sleep(0.03)
+    assert app.client.get("/").text == "2"
+    assert backend.stats.stale_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_one_refresh_per_key_and_max_refreshes(backend):
+    calls = []
+
+    @cached(ttl=0, stale_ttl=60, max_refreshes=1, backend=backend)
+    async def index(req, res):
+        calls.append(req.url.path)
+        res.text = "Hello"
+
+    for path in ("/a", "/b"):
+        await index(*_make_request(path))
+    assert calls == ["/a", "/b"]
+
+    # Stale hits: only one refresh is scheduled for "/a", and none for "/b"
+    # because of `max_refreshes`.
+    stale = [_make_request("/a"), _make_request("/a"), _make_request("/b")]
+    for req, res in stale:
+        await index(req, res)
+        assert res.content == b"Hello"
+    assert backend.stats.stale_hits == 3
+    assert backend.stats.skipped_refreshes == 1
+
+    for _, res in stale:
+        task = res._background_task
+        if task is not None:
+            await task()
+    assert calls == ["/a", "/b", "/a"]
+    assert backend.stats.refreshes == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("replaced", [True, False])
+async def test_refresh_runs_if_background_task_is_replaced_or_not_run(
+    backend, replaced
+):
+    calls = 0
+
+    @cached(ttl=0, stale_ttl=60, max_refreshes=1, backend=backend)
+    async def index(req, res):
+        nonlocal calls
+        calls += 1
+        res.text = str(calls)
+
+    await index(*_make_request("/"))
+
+    for expected_calls in (2, 3):
+        req, res = _make_request("/")
+        await index(req, res)
+        assert backend.stats.stale_hits == expected_calls - 1
+        if replaced:
+            # E.g. an after hook registers its own background task,
+            # which replaces the refresh.
+            @res.background
+            async def other():
+                pass
+
+            await res._background_task()
+        # Otherwise, sending the response failed and the background task
+        # did not run.
+        await asyncio.sleep(0.01)
+        assert calls == expected_calls
+        assert backend.stats.refreshes == expected_calls - 1
+
+    assert backend.stats.skipped_refreshes == 0
+
+
+def _response(size: int) -> CachedResponse:
+    return CachedResponse(200, {}, b"x" * size)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_bytes=100)
+    await backend.set("a", _response(40), ttl=60)
+    await backend.set("b", _response(40), ttl=60)
+    assert await backend.get("a") is not None  # "b" is now the LRU entry
+    await backend.set("c", _response(40), ttl=60)
+    assert await backend.get("b") is None
+    assert await backend.get("a") is not None
+    assert await backend.get("c") is not None
+    assert backend.currsize == 80
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_skips_too_large_responses():
+    backend = MemoryBackend(max_bytes=10)
+    await backend.set("a", _response(20), ttl=60)
+    assert len(backend) == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_delete_and_clear():
+    backend = MemoryBackend()
+    await backend.set("a", _response(1), ttl=60)
+    await backend.set("b", _response(1), ttl=60)
+    await backend.delete("a")
+    assert await backend.get("a") is None
+    await backend.clear()
+    assert len(backend) == 0 and backend.currsize == 0
+
+
+def test_cached_response_serialization():
+    response = CachedResponse(200, {"content-type": "text/plain"}, b"a\nb")
+    assert CachedResponse.loads(response.dumps()) == response
+
+
+@pytest.mark.asyncio
+async def test_socket_backend(tmpdir):
+    path = str(tmpdir.join("cache.sock"))
+    server = CacheServer(path)
+    await server.start()
+    try:
+        backend = SocketBackend(path)
+        assert await backend.get("a") is None
+        response = CachedResponse(200, {"x-foo": "bar"}, b"Hello")
+        await backend.set("a", response, ttl=60)
+        assert await backend.get("a") == response
+        await backend.delete("a")
+        assert await backend.get("a") is None
+        await backend.set("a", response, ttl=60)
+        await backend.clear()
+        assert await backend.get("a") is None
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_socket_backend_without_server(tmpdir):
+    backend = SocketBackend(str(tmpdir.join("missing.sock")))
+    response = CachedResponse(200, {}, b"Hello")
+    await backend.set("a", response, ttl=60)
+    assert await backend.get("a") is None
+    await backend.delete("a")
+
+
+def test_cached_view_is_served_without_cache_server(app: App, tmpdir):
+    backend = SocketBackend(str(tmpdir.join("missing.sock")))
+
+    @app.route("/")
+    @cached(backend=backend)
+    async def index(req, res):
+        res.text = "Hello"
+
+    assert app.client.get("/").text == "Hello"
+    assert app.client.get("/").text == "Hello"
+    assert backend.stats.misses == 2
+
+
+def _make_request(path: str = "/", method: str = "GET", headers=()):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    req = Request(scope)
+    return req, Response(req, media_type="application/json", media_handler=str)
+
+
+def _make_coalescing(handler, **kwargs):
+    calls = []
+
+    async def inner(req, res):
+        calls.append(req.url.path)
+        await asyncio.sleep(0.01)
+        await handler(req, res)
+        return res
+
+    return CoalescingMiddleware(inner, **kwargs), calls
+
+
+@pytest.mark.asyncio
+async def test_coalescing_runs_handler_once_for_concurrent_requests():
+    async def handler(req, res):
+        res.headers["x-foo"] = "bar"
+        res.text = "Hello"
+
+    middleware, calls = _make_coalescing(handler)
+    pairs = [_make_request() for _ in range(10)]
+    results = await asyncio.gather(*(middleware(*pair) for pair in pairs))
+
+    assert calls == ["/"]
+    for (_, res), result in zip(pairs, results):
+        assert result is res
+        assert res.content in ("Hello", b"Hello")
+        assert res.headers["x-foo"] == "bar"
+
+
+@pytest.mark.asyncio
+async def test_coalescing_distinguishes_paths_and_vary_headers():
+    async def handler(req, res):
+        res.text = req.url.path
+
+    middleware, calls = _make_coalescing(handler, vary=["accept-language"])
+    await asyncio.gather(
+        middleware(*_make_request("/a", headers=[("accept-language", "fr")])),
+        middleware(*_make_request("/a", headers=[("accept-language", "en")])),
+        middleware(*_make_request("/b")),
+    )
+    assert sorted(calls) == ["/a", "/a", "/b"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("header", ["authorization", "cookie"])
+async def test_coalescing_ignores_requests_with_credentials(header: str):
+    async def handler(req, res):
+        res.text = f"user={req.headers[header]}"
+
+    middleware, calls = _make_coalescing(handler)
+    alice, bob = (_make_request(headers=[(header, name)]) for name in "ab")
+    await asyncio.gather(middleware(*alice), middleware(*bob))
+    assert len(calls) == 2
+    assert alice[1].content == "user=a"
+    assert bob[1].content == "user=b"
+
+
+@pytest.mark.asyncio
+async def test_coalescing_with_credentials_in_vary():
+    async def handler(req, res):
+        res.text = f"user={req.headers['authorization']}"
+
+    middleware, calls = _make_coalescing(handler, vary=["Authorization"])
+    requests = [
+        _make_request(headers=[("authorization", name)]) for name in "aab"
+    ]
+    await asyncio.gather(*(middleware(*request) for request in requests))
+    assert len(calls) == 2
+    assert [res.content for _, res in requests] == [
+        "user=a",
+        b"user=a",
+        "user=b",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalescing_does_not_share_cookies():
+    async def handler(req, res):
+        res.headers["Set-Cookie"] = "session=123"
+        res.text = "Hello"
+
+    middleware, calls = _make_coalescing(handler)
+    await asyncio.gather(*(middleware(*_make_request()) for _ in range(3)))
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalescing_ignores_unsafe_methods():
+    async def handler(req, res):
+        res.text = "Hello"
+
+    middleware, calls = _make_coalescing(handler)
+    await asyncio.gather(
+        *(middleware(*_make_request(method="POST")) for _ in range(3))
+    )
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalescing_shares_exceptions():
+    async def handler(req, res):
+        raise HTTPError(503)
+
+    middleware, calls = _make_coalescing(handler)
+    results = await asyncio.gather(
+        *(middleware(*_make_request()) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert calls == ["/"]
+    assert all(isinstance(exc, HTTPError) for exc in results)
+    assert not middleware._inflight
+
+
+@pytest.mark.asyncio
+async def test_coalescing_reprocesses_streamed_responses():
+    async def handler(req, res):
+        @res.stream
+        async def stream():
+            yield "Hello"
+
+    middleware, calls = _make_coalescing(handler)
+    await asyncio.gather(*(middleware(*_make_request()) for _ in range(3)))
+    assert len(calls) == 3
+
+
+def test_coalescing_middleware_on_app(app: App):
+    app.add_middleware(CoalescingMiddleware)
+
+    @app.route("/")
+    async def index(req, res):
+        res.text = "Hello"
+
+    r = app.client.get("/")
+    assert r.status_code == 200
+    assert r.text == "Hello"
@@ -0,0 +1,34 @@
+import threading
+
+import pytest
+
+from bocadillo.compat import to_async
+from bocadillo.executors import Executor
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+def test_coroutine_function_is_returned_as_is():
+    async def func():
+        pass
+
+    assert to_async(func) is func
+
+
+@pytest.mark.asyncio
+async def test_sync_function_runs_in_thread_pool():
+    async_func = to_async(_thread_name)
+    assert async_func.__name__ == "_thread_name"
+    assert await async_func() != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_sync_function_runs_in_executor():
+    executor = Executor("compat")
+    try:
+        name = await to_async(_thread_name, executor=executor)()
+        assert name.startswith("bocadillo-compat")
+    finally:
+        executor.shutdown()
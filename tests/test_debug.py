@@ -44,3 +44,35 @@ def test_debug_response(app: App, accept: str, content_type: str):
     assert r.status_code == 500
     assert r.headers["content-type"] == content_type
     assert 'raise ValueError("Oops")' in r.text
+
+
+def test_debug_template_is_compiled_once(app: App):
+    app.debug = True
+
+    @app.route("/")
+    async def index(req, res):
+        raise ValueError("Oops")
+
+    client = app.build_client(raise_server_exceptions=False)
+    client.get("/", headers={"accept": "text/html"})
+    template = app.server_error_middleware._template
+    assert template is not None
+    client.get("/", headers={"accept": "text/html"})
+    assert app.server_error_middleware._template is template
+
+
+def test_debug_locals_are_capped(app: App):
+    app.debug = True
+    app.server_error_middleware.max_locals = 3
+
+    @app.route("/")
+    async def index(req, res):
+        big = "x" * 10000
+        a = b = c = d = 1
+        raise ValueError("Oops")
+
+    client = app.build_client(raise_server_exceptions=False)
+    r = client.get("/", headers={"accept": "text/html"})
+    assert r.status_code == 500
+    assert "x" * 10000 not in r.text
+    assert "4 more" in r.text
@@ -0,0 +1,235 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from bocadillo import App, Middleware, hooks, view
+from bocadillo.executors import (
+    Executor,
+    ProcessExecutor,
+    get_default_process_executor,
+)
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+# NOTE: process views must be module-level functions.
+
+
+def _request_info(body: bytes, params: dict, headers: dict) -> dict:
+    return {
+        "pid": os.getpid(),
+        "body": body.decode(),
+        "params": params,
+        "headers": headers,
+    }
+
+
+def _reverse(body: bytes, params: dict, headers: dict):
+    return body[::-1], {"content-type": "image/png"}
+
+
+def _greet(body: bytes, params: dict, headers: dict) -> str:
+    return f"Hello, {params['name']}!"
+
+
+def test_add_executor(app: App):
+    executor = app.add_executor("reports", max_workers=2)
+    assert app.executors["reports"] is executor
+    assert executor.name == "reports"
+    assert executor.max_workers == 2
+    assert executor.thread_name_prefix == "bocadillo-reports"
+
+
+def test_executor_is_shut_down_with_app(app: App):
+    executor = app.add_executor("reports")
+
+    @app.route("/")
+    @view(executor=executor)
+    def index(req, res):
+        res.text = _thread_name()
+
+    for _ in range(2):
+        with app.client:
+            assert app.client.get("/").text.startswith("bocadillo-reports")
+            pool = executor._pool
+            assert pool is not None
+        assert executor._pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(print)
+
+
+def test_view_runs_in_executor(app: App):
+    executor = app.add_executor("reports", thread_name_prefix="reports")
+
+    @app.route("/")
+    @view(executor=executor)
+    def index(req, res):
+        res.text = _thread_name()
+
+    @app.route("/default")
+    def default(req, res):
+        res.text = _thread_name()
+
+    assert app.client.get("/").text.startswith("reports")
+    assert not app.client.get("/default").text.startswith("reports")
+
+
+def test_hook_runs_in_executor(app: App):
+    executor = app.add_executor("hooks")
+    thread_names = []
+
+    def record(req, res, params):
+        thread_names.append(_thread_name())
+
+    @app.route("/")
+    @hooks.before(record, executor=executor)
+    async def index(req, res):
+        pass
+
+    app.client.get("/")
+    assert thread_names[0].startswith("bocadillo-hooks")
+
+
+def test_middleware_runs_in_executor(app: App):
+    executor = app.add_executor("middleware")
+    thread_names = []
+
+    class RecordMiddleware(Middleware):
+        def before_dispatch(self, req, res):
+            thread_names.append(_thread_name())
+
+    app.add_middleware(RecordMiddleware, executor=executor)
+
+    @app.route("/")
+    async def index(req, res):
+        pass
+
+    app.client.get("/")
+    assert thread_names[0].startswith("bocadillo-middleware")
+
+
+@pytest.mark.asyncio
+async def test_executor_stats():
+    executor = Executor("test", max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+        return "done"
+
+    assert executor.stats() == ("test", 1, 0, 0)
+
+    tasks = [asyncio.ensure_future(executor.run(block)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert started.wait(1)
+    stats = executor.stats()
+    assert stats.active == 1
+    assert stats.queued == 2
+
+    release.set()
+    assert await asyncio.gather(*tasks) == ["done"] * 3
+    assert executor.stats() == ("test", 1, 0, 0)
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_copies_context():
+    contextvars = pytest.importorskip("contextvars")
+    request_id = contextvars.ContextVar("request_id", default="unset")
+    executor = Executor("test")
+    request_id.set("req-1")
+    try:
+        assert await executor.run(request_id.get) == "req-1"
+    finally:
+        executor.shutdown()
+
+
+def test_process_view_runs_in_child_process(app: App):
+    app.route("/items/{pk}")(
+        view(methods=["post"], executor="process", headers=["X-Token"])(
+            _request_info
+        )
+    )
+
+    with app.client:
+        response = app.client.post(
+            "/items/1", data="hello", headers={"x-token": "t", "x-other": "o"}
+        )
+
+    assert response.status_code == 200
+    info = response.json()
+    assert info.pop("pid") != os.getpid()
+    assert info == {
+        "body": "hello",
+        "params": {"pk": "1"},
+        "headers": {"x-token": "t"},
+    }
+
+
+def test_process_view_result_is_applied_to_response(app: App):
+    executor = app.add_process_executor("images", max_workers=1)
+    app.route("/reverse")(view(methods=["post"], executor=executor)(_reverse))
+    app.route("/greet/{name}")(view(executor=executor)(_greet))
+
+    with app.client:
+        response = app.client.post("/reverse", data=b"abc")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.content == b"cba"
+
+        response = app.client.get("/greet/Bocadillo")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/plain"
+        assert response.text == "Hello, Bocadillo!"
+
+
+def test_process_executor_follows_app_lifespan(app: App):
+    executor = app.add_process_executor("images", max_workers=2)
+    assert app.executors["images"] is executor
+    assert executor._pool is None
+
+    with app.client:
+        assert executor._pool is not None
+
+    assert executor._pool is None
+
+
+def test_default_process_executor_follows_app_lifespan(app: App):
+    app.route("/greet/{name}")(view(executor="process")(_greet))
+    executor = get_default_process_executor()
+    executor.shutdown()
+
+    with app.client:
+        # Started on startup, i.e. before the first request.
+        assert executor._pool is not None
+        assert app.client.get("/greet/Bocadillo").text == "Hello, Bocadillo!"
+
+    assert executor._pool is None
+
+
+def test_process_view_must_be_a_regular_function():
+    async def index(body, params, headers):
+        pass
+
+    with pytest.raises(TypeError):
+        view(executor="process")(index)
+
+
+def test_unknown_executor_name():
+    with pytest.raises(ValueError):
+        view(executor="foo")(_greet)
+
+
+@pytest.mark.asyncio
+async def test_process_executor_stats():
+    executor = ProcessExecutor("test", max_workers=1)
+    assert executor.stats() == ("test", 1, 0, 0)
+    assert await executor.run(os.getpid) != os.getpid()
+    assert executor.stats() == ("test", 1, 0, 0)
+    executor.shutdown()
@@ -3,6 +3,7 @@ from http import HTTPStatus
 import pytest
 
 from bocadillo import App, HTTPError
+from bocadillo.errors import STATUSES
 from bocadillo.error_handlers import (
     error_to_html,
     error_to_media,
@@ -69,6 +70,47 @@ def test_custom_error_handler(app: App, exception_cls):
         assert not called
 
 
+def test_most_specific_error_handler_is_used(app: App):
+    @app.error_handler(Exception)
+    def on_exception(req, res, exc):
+        res.text = "exception"
+
+    @app.error_handler(LookupError)
+    def on_lookup_error(req, res, exc):
+        res.text = "lookup"
+
+    @app.route("/{name}")
+    async def index(req, res, name):
+        raise {"key": KeyError, "value": ValueError}[name]()
+
+    assert app.client.get("/key").text == "lookup"
+    assert app.client.get("/value").text == "exception"
+
+    @app.error_handler(KeyError)
+    def on_key_error(req, res, exc):
+        res.text = "key"
+
+    # Handlers resolved earlier are not reused.
+    assert app.client.get("/key").text == "key"
+
+
+def test_unhandled_exception_is_only_raised_for_its_request(app: App):
+    @app.route("/fail")
+    async def fail(req, res):
+        raise ValueError("boom")
+
+    @app.route("/ok")
+    async def ok(req, res):
+        res.text = "OK"
+
+    with pytest.raises(ValueError):
+        app.client.get("/fail")
+
+    response = app.client.get("/ok")
+    assert response.status_code == 200
+    assert response.text == "OK"
+
+
 # Use in a test to run against multiple error details. See:
 # https://docs.pytest.org/en/latest/fixture.html#parametrizing-fixtures
 @pytest.fixture(params=["", "Nope!"])
@@ -128,3 +170,15 @@ def test_http_error_status_must_be_int_or_http_status():
 
 def test_http_error_str_representation():
     assert str(HTTPError(404, detail="foo")) == "404 Not Found"
+
+
+def test_http_error_uses_precomputed_status_info():
+    first, second = HTTPError(404), HTTPError(HTTPStatus.NOT_FOUND)
+    assert first.info is second.info is STATUSES[404]
+    assert first.info.text == b"404 Not Found"
+    assert first.info.html == b"<h1>404 Not Found</h1>"
+
+
+def test_http_error_status_must_be_known():
+    with pytest.raises(ValueError):
+        HTTPError(499)
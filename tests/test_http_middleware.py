@@ -185,3 +185,125 @@ def test_return_response_in_before_hook(app: App):
     r = app.client.get("/")
     assert r.status_code == 200
     assert r.text == "Foo"
+
+
+def _tracing(calls: list, name: str, before=True, after=True, stop=False):
+    attrs = {}
+    if before:
+
+        async def before_dispatch(self, req, res):
+            calls.append(f"{name}.before")
+            if stop:
+                res.text = name
+                return res
+
+        attrs["before_dispatch"] = before_dispatch
+
+    if after:
+
+        async def after_dispatch(self, req, res):
+            calls.append(f"{name}.after")
+
+        attrs["after_dispatch"] = after_dispatch
+
+    return type(name, (Middleware,), attrs)
+
+
+def test_middleware_are_called_in_nesting_order(app: App):
+    calls = []
+    app.add_middleware(_tracing(calls, "inner"))
+    app.add_middleware(_tracing(calls, "before_only", after=False))
+    app.add_middleware(_tracing(calls, "after_only", before=False))
+    app.add_middleware(_tracing(calls, "outer"))
+
+    @app.route("/")
+    async def index(req, res):
+        calls.append("view")
+
+    assert app.client.get("/").status_code == 200
+    assert calls == [
+        "outer.before",
+        "before_only.before",
+        "inner.before",
+        "view",
+        "inner.after",
+        "after_only.after",
+        "outer.after",
+    ]
+
+
+def test_outer_after_dispatch_is_called_if_before_returns_response(app: App):
+    calls = []
+    app.add_middleware(_tracing(calls, "inner"))
+    app.add_middleware(_tracing(calls, "stop", stop=True))
+    app.add_middleware(_tracing(calls, "outer"))
+
+    @app.route("/")
+    async def index(req, res):
+        calls.append("view")
+
+    response = app.client.get("/")
+    assert response.text == "stop"
+    assert calls == ["outer.before", "stop.before", "outer.after"]
+
+
+def test_noop_middleware_are_dropped_from_pipeline(app: App):
+    class Noop(Middleware):
+        pass
+
+    app.add_middleware(Noop)
+
+    @app.route("/")
+    async def index(req, res):
+        pass
+
+    assert app.client.get("/").status_code == 200
+    assert not isinstance(app.exception_middleware.app, Noop)
+
+
+def test_custom_process_is_kept_in_pipeline(app: App):
+    calls = []
+    app.add_middleware(_tracing(calls, "inner"))
+
+    class Custom(Middleware):
+        async def process(self, req, res):
+            calls.append("custom")
+            return await self.inner(req, res)
+
+        __call__ = process
+
+    app.add_middleware(Custom)
+    app.add_middleware(_tracing(calls, "outer"))
+
+    @app.route("/")
+    async def index(req, res):
+        calls.append("view")
+
+    assert app.client.get("/").status_code == 200
+    assert calls == [
+        "outer.before",
+        "custom",
+        "inner.before",
+        "view",
+        "inner.after",
+        "outer.after",
+    ]
+
+
+def test_middleware_added_after_first_request_is_called(app: App):
+    calls = []
+
+    @app.route("/")
+    async def index(req, res):
+        pass
+
+    app.add_middleware(_tracing(calls, "first"))
+    app.client.get("/")
+    app.add_middleware(_tracing(calls, "second"))
+    app.client.get("/")
+    assert calls[2:] == [
+        "second.before",
+        "first.before",
+        "first.after",
+        "second.after",
+    ]
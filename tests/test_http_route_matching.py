@@ -0,0 +1,150 @@
+import pytest
+
+from bocadillo import App
+
+
+def test_route_added_after_first_request_is_matched(app: App):
+    @app.route("/foo")
+    async def foo(req, res):
+        res.text = "foo"
+
+    assert app.client.get("/bar").status_code == 404
+
+    @app.route("/bar")
+    async def bar(req, res):
+        res.text = "bar"
+
+    r = app.client.get("/bar")
+    assert r.status_code == 200
+    assert r.text == "bar"
+
+
+@pytest.mark.parametrize("path", ["/foo/bar", "/FOO/Bar"])
+def test_static_segments_are_matched_case_insensitively(app: App, path):
+    @app.route("/foo/bar")
+    async def foo_bar(req, res):
+        res.text = "bar"
+
+    assert app.client.get(path).text == "bar"
+
+
+def test_earlier_parametrized_route_has_precedence(app: App):
+    @app.route("/{first}/bar")
+    async def any_bar(req, res, first):
+        res.text = first
+
+    @app.route("/foo/bar")
+    async def foo_bar(req, res):
+        res.text = "bar"
+
+    assert app.client.get("/foo/bar").text == "foo"
+
+
+def test_parameter_may_span_multiple_segments(app: App):
+    @app.route("/files/{path}")
+    async def files(req, res, path):
+        res.text = path
+
+    @app.route("/files/css/{name}")
+    async def css(req, res, name):
+        res.text = "css"
+
+    assert app.client.get("/files/js/app.js").text == "js/app.js"
+    assert app.client.get("/files/css/app.css").text == "css/app.css"
+
+
+def test_many_routes(app: App):
+    for i in range(100):
+
+        @app.route(f"/items/{i}/{{pk:d}}", name=f"item_{i}")
+        async def item(req, res, pk, i=i):
+            res.text = f"{i}-{pk}"
+
+    assert app.client.get("/items/42/7").text == "42-7"
+    assert app.client.get("/items/100/7").status_code == 404
+
+
+def test_if_two_static_routes_have_same_pattern_then_first_wins(app: App):
+    @app.route("/health")
+    async def first(req, res):
+        res.text = "first"
+
+    @app.route("/health")
+    async def second(req, res):
+        res.text = "second"
+
+    assert app.client.get("/health").text == "first"
+
+
+def test_static_route_registered_before_catch_all_has_precedence(app: App):
+    @app.route("/health")
+    async def health(req, res):
+        res.text = "ok"
+
+    @app.route("{}")
+    async def catch_all(req, res):
+        res.text = "catch-all"
+
+    assert app.client.get("/health").text == "ok"
+    assert app.client.get("/health/").text == "catch-all"
+
+
+def test_match_cache_is_disabled_by_default(app: App):
+    @app.route("/foo")
+    async def foo(req, res):
+        pass
+
+    app.client.get("/foo")
+    assert app.http_router.cache_info() == (0, 0, 0, 0)
+
+
+def test_match_cache_counts_hits_and_misses():
+    app = App(route_cache_size=2)
+
+    @app.route("/greet/{person}")
+    async def greet(req, res, person):
+        res.text = person
+
+    for _ in range(3):
+        assert app.client.get("/greet/John").text == "John"
+
+    info = app.http_router.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (2, 1, 2, 1)
+
+
+def test_match_cache_evicts_least_recently_used_path():
+    app = App(route_cache_size=2)
+
+    @app.route("/greet/{person}")
+    async def greet(req, res, person):
+        res.text = person
+
+    for person in "abcb":
+        assert app.client.get(f"/greet/{person}").text == person
+
+    assert app.http_router.cache_info().currsize == 2
+    assert app.client.get("/greet/a").text == "a"
+    assert app.http_router.cache_info().hits == 1
+
+
+def test_match_cache_is_invalidated_when_route_added():
+    app = App(route_cache_size=10)
+
+    @app.route("{}")
+    async def catch_all(req, res):
+        res.text = "catch-all"
+
+    assert app.client.get("/foo").text == "catch-all"
+    assert app.http_router.cache_info().currsize == 1
+
+    @app.route("/foo")
+    async def foo(req, res):
+        res.text = "foo"
+
+    assert app.http_router.cache_info().currsize == 0
+
+
+def test_unmatched_paths_are_not_cached():
+    app = App(route_cache_size=10)
+    assert app.client.get("/foo").status_code == 404
+    assert app.http_router.cache_info().currsize == 0
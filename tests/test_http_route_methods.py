@@ -56,3 +56,39 @@ def test_if_methods_is_all_then_all_methods_allowed(app: App):
 
     for method in map(str.lower, ALL_HTTP_METHODS):
         assert getattr(app.client, method)("/").status_code == 200
+
+
+def test_method_not_allowed_sends_allow_header(app: App):
+    @app.route("/")
+    class Index:
+        async def get(self, req, res):
+            pass
+
+        async def post(self, req, res):
+            pass
+
+    response = app.client.put("/")
+    assert response.status_code == 405
+    assert response.headers["allow"] == "GET, HEAD, POST"
+
+
+def test_view_handlers_are_keyed_by_uppercase_method():
+    @view(methods=["post", "get"])
+    async def index(req, res):
+        pass
+
+    assert set(index.handlers) == {"GET", "HEAD", "POST"}
+    assert index.get_handler("post") is index.handlers["POST"]
+    with pytest.raises(TypeError):
+        index.handlers["PUT"] = index.handlers["GET"]
+
+
+def test_methods_all_supports_unknown_methods(app: App):
+    @app.route("/")
+    @view(methods=all)
+    async def index(req, res):
+        res.text = req.method
+
+    response = app.client.request("PROPFIND", "/")
+    assert response.status_code == 200
+    assert response.text == "PROPFIND"
@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 
 from bocadillo import App, view
@@ -78,3 +81,58 @@ def test_from_obj(app: App):
 
     app.route("/")(MyView())
     assert app.client.get("/").status_code == 200
+
+
+@pytest.mark.parametrize(
+    "blocking, same_thread", [(True, False), (False, True)]
+)
+def test_sync_handler_blocking(app: App, blocking: bool, same_thread: bool):
+    loop_thread = None
+
+    @app.on("startup")
+    async def get_loop_thread():
+        nonlocal loop_thread
+        loop_thread = threading.get_ident()
+
+    @app.route("/")
+    @view(blocking=blocking)
+    def index(req, res):
+        res.text = str(threading.get_ident())
+
+    with app.client:
+        response = app.client.get("/")
+    assert response.status_code == 200
+    assert (int(response.text) == loop_thread) is same_thread
+
+
+def test_non_blocking_view_lists_inline_methods():
+    @view(methods=["get", "post"], blocking=False)
+    def index(req, res):
+        pass
+
+    @view(methods=["get"], blocking=False)
+    async def other(req, res):
+        pass
+
+    assert index.inline == {"GET", "HEAD", "POST"}
+    assert other.inline == set()
+    assert view()(lambda req, res: None).inline == set()
+
+
+@pytest.mark.parametrize("debug, warns", [(True, True), (False, False)])
+def test_watchdog_warns_when_inline_handler_blocks(
+    app: App, debug: bool, warns: bool
+):
+    app.debug = debug
+    app.http_router.blocking_threshold = 0.01
+
+    @app.route("/")
+    @view(blocking=False)
+    def index(req, res):
+        time.sleep(0.02)
+
+    with pytest.warns(None) as record:
+        app.client.get("/")
+
+    messages = [str(w.message) for w in record]
+    assert any("blocked the event loop" in m for m in messages) is warns
@@ -0,0 +1,103 @@
+import pytest
+
+from bocadillo import App, WebSocket
+from bocadillo.json_engines import (
+    ENGINES,
+    JSONEngine,
+    StdlibEngine,
+    get_json_engine,
+)
+
+ENGINE_NAMES = list(ENGINES)
+
+
+@pytest.fixture(params=ENGINE_NAMES)
+def engine_name(request) -> str:
+    module_name = getattr(ENGINES[request.param], "module_name", "json")
+    pytest.importorskip(module_name)
+    return request.param
+
+
+def test_default_engine_is_stdlib():
+    assert isinstance(App().json_engine, StdlibEngine)
+
+
+def test_unknown_engine_raises_value_error():
+    with pytest.raises(ValueError) as ctx:
+        App(json_engine="foo")
+    assert "foo" in str(ctx.value)
+
+
+def test_auto_selects_an_engine():
+    assert isinstance(get_json_engine("auto"), JSONEngine)
+
+
+def test_engine_object_is_used_as_is():
+    engine = StdlibEngine()
+    assert App(json_engine=engine).json_engine is engine
+
+
+def test_engines_dump_to_bytes(engine_name: str):
+    engine = get_json_engine(engine_name)
+    assert engine.name == engine_name
+    dumped = engine.dumps({"message": "hello"})
+    assert isinstance(dumped, bytes)
+    assert engine.loads(dumped) == {"message": "hello"}
+
+
+def test_media_uses_engine(engine_name: str):
+    app = App(json_engine=engine_name)
+    data = {"message": "hello", "items": [1, 2.5, None, True]}
+
+    @app.route("/")
+    async def index(req, res):
+        res.media = data
+
+    response = app.client.get("/")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == data
+
+
+@pytest.mark.parametrize("body, status", [("{", 400), ('{"a": 1}', 200)])
+def test_request_json_uses_engine(engine_name: str, body: str, status: int):
+    app = App(json_engine=engine_name)
+
+    @app.route("/")
+    class Index:
+        async def post(self, req, res):
+            res.media = await req.json()
+
+    response = app.client.post("/", data=body)
+    assert response.status_code == status
+    if status == 200:
+        assert response.json() == {"a": 1}
+
+
+def test_custom_engine():
+    class UpperEngine(StdlibEngine):
+        def dumps(self, value) -> bytes:
+            return super().dumps(value).upper()
+
+    app = App(json_engine=UpperEngine())
+
+    @app.route("/")
+    async def index(req, res):
+        res.media = {"message": "hello"}
+
+    assert app.client.get("/").json() == {"MESSAGE": "HELLO"}
+
+
+def test_websocket_json_uses_engine(engine_name: str):
+    app = App(json_engine=engine_name)
+
+    @app.websocket_route("/chat", value_type="json")
+    async def chat(ws: WebSocket):
+        assert ws.json_engine is app.json_engine
+        async with ws:
+            message = await ws.receive()
+            await ws.send({"echo": message})
+
+    with app.client.websocket_connect("/chat") as client:
+        client.send_json({"message": "hello"})
+        assert client.receive_json() == {"echo": {"message": "hello"}}
@@ -1,3 +1,5 @@
+import pytest
+
 from bocadillo import App
 
 
@@ -13,3 +15,73 @@ def test_access_sub_route(app: App):
     r = app.client.get("/other/foo")
     assert r.status_code == 200
     assert r.text == "OK"
+
+
+def test_longest_prefix_wins(app: App):
+    outer = App()
+    inner = App()
+
+    @outer.route("/bar")
+    async def outer_bar(req, res):
+        res.text = "outer"
+
+    @inner.route("/bar")
+    async def inner_bar(req, res):
+        res.text = "inner"
+
+    app.mount("/foo", outer)
+    app.mount("/foo/baz", inner)
+
+    assert app.client.get("/foo/bar").text == "outer"
+    assert app.client.get("/foo/baz/bar").text == "inner"
+
+
+def test_prefix_matches_on_segment_boundaries(app: App):
+    other = App()
+
+    @other.route("{}")
+    async def everything(req, res):
+        res.text = "other"
+
+    @app.route("/statistics")
+    async def statistics(req, res):
+        res.text = "statistics"
+
+    app.mount("/stat", other)
+
+    assert app.client.get("/stat/foo").text == "other"
+    assert app.client.get("/statistics").text == "statistics"
+
+
+def test_trailing_slash_in_prefix_is_ignored(app: App):
+    other = App()
+
+    @other.route("/foo")
+    async def foo(req, res):
+        res.text = "OK"
+
+    app.mount("/other/", other)
+
+    assert app.client.get("/other/foo").text == "OK"
+
+
+def test_mount_wsgi_app(app: App):
+    def wsgi(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"Hello from WSGI"]
+
+    app.mount("/wsgi", wsgi)
+
+    r = app.client.get("/wsgi/foo")
+    assert r.status_code == 200
+    assert r.text == "Hello from WSGI"
+
+
+def test_type_error_in_asgi_app_is_not_hidden(app: App):
+    def asgi(scope):
+        raise TypeError("oops")
+
+    app.mount("/asgi", asgi)
+
+    with pytest.raises(TypeError, match="oops"):
+        app.client.get("/asgi/foo")
@@ -0,0 +1,131 @@
+import pytest
+
+from bocadillo import App
+
+
+def test_etags_disabled_by_default(app: App):
+    @app.route("/")
+    async def index(req, res):
+        res.text = "Hello"
+
+    assert "etag" not in app.client.get("/").headers
+
+
+@pytest.fixture
+def etag_app() -> App:
+    app = App(enable_etags=True)
+
+    @app.route("/")
+    async def index(req, res):
+        res.media = {"message": "hello"}
+
+    return app
+
+
+def test_etag_is_computed_from_content(etag_app: App):
+    r1 = etag_app.client.get("/")
+    r2 = etag_app.client.get("/")
+    assert r1.status_code == 200
+    etag = r1.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert r2.headers["etag"] == etag
+
+
+def test_if_none_match_returns_empty_304(etag_app: App):
+    etag = etag_app.client.get("/").headers["etag"]
+    r = etag_app.client.get("/", headers={"if-none-match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    assert "content-type" not in r.headers
+
+
+@pytest.mark.parametrize("if_none_match", ['"other"', 'W/"other", "stuff"'])
+def test_if_none_match_mismatch_returns_200(etag_app: App, if_none_match):
+    r = etag_app.client.get("/", headers={"if-none-match": if_none_match})
+    assert r.status_code == 200
+    assert r.json() == {"message": "hello"}
+
+
+def test_if_none_match_star(etag_app: App):
+    r = etag_app.client.get("/", headers={"if-none-match": "*"})
+    assert r.status_code == 304
+
+
+def test_etag_depends_on_content():
+    app = App(enable_etags=True)
+
+    @app.route("/{word}")
+    async def index(req, res, word):
+        res.text = word
+
+    assert (
+        app.client.get("/foo").headers["etag"]
+        != app.client.get("/bar").headers["etag"]
+    )
+
+
+def test_no_etag_on_non_200_or_unsafe_methods():
+    app = App(enable_etags=True)
+
+    @app.route("/")
+    class Index:
+        async def get(self, req, res):
+            res.status_code = 201
+            res.text = "Created"
+
+        async def post(self, req, res):
+            res.text = "Posted"
+
+    assert "etag" not in app.client.get("/").headers
+    assert "etag" not in app.client.post("/").headers
+
+
+def test_enable_per_route(app: App):
+    @app.route("/", etags=True)
+    async def index(req, res):
+        res.text = "Hello"
+
+    @app.route("/other")
+    async def other(req, res):
+        res.text = "Hello"
+
+    etag = app.client.get("/").headers["etag"]
+    r = app.client.get("/", headers={"if-none-match": etag})
+    assert r.status_code == 304
+    assert "etag" not in app.client.get("/other").headers
+
+
+def test_disable_per_route(etag_app: App):
+    @etag_app.route("/nocache", etags=False)
+    async def nocache(req, res):
+        res.text = "Hello"
+
+    assert "etag" not in etag_app.client.get("/nocache").headers
+
+
+def test_user_supplied_version_key_is_weak_etag(app: App):
+    @app.route("/")
+    async def index(req, res):
+        res.etag = "v42"
+        res.text = "Hello"
+
+    r = app.client.get("/")
+    assert r.headers["etag"] == 'W/"v42"'
+    r = app.client.get("/", headers={"if-none-match": '"v42"'})
+    assert r.status_code == 304
+
+
+def test_quoted_version_key_is_used_as_is(app: App):
+    @app.route("/")
+    async def index(req, res):
+        res.etag = '"abc"'
+        res.text = "Hello"
+
+    assert app.client.get("/").headers["etag"] == '"abc"'
+
+
+def test_head_request_gets_304(etag_app: App):
+    etag = etag_app.client.head("/").headers["etag"]
+    r = etag_app.client.head("/", headers={"if-none-match": etag})
+    assert r.status_code == 304
@@ -4,6 +4,7 @@ from typing import Optional
 import pytest
 
 from bocadillo import App
+from bocadillo.files import stat_file
 
 
 @pytest.fixture
@@ -43,3 +44,122 @@ def test_if_file_does_not_exist_then_fail(app: App):
         app.client.get("/")
 
     assert "does not exist" in str(ctx.value)
+
+
+@pytest.fixture
+def file_app(app: App, txt: Path) -> App:
+    @app.route("/")
+    async def index(req, res):
+        res.file(str(txt), attach=False)
+
+    return app
+
+
+def test_file_response_headers(file_app: App):
+    response = file_app.client.get("/")
+    assert response.headers["content-type"] == "text/plain"
+    assert response.headers["content-length"] == "8"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "etag" in response.headers
+    assert "last-modified" in response.headers
+
+
+@pytest.mark.parametrize(
+    "header, value_from",
+    [("if-none-match", "etag"), ("if-modified-since", "last-modified")],
+)
+def test_if_not_modified_then_304(file_app: App, header: str, value_from: str):
+    value = file_app.client.get("/").headers[value_from]
+    response = file_app.client.get("/", headers={header: value})
+    assert response.status_code == 304
+    assert response.text == ""
+
+
+def test_if_etag_does_not_match_then_200(file_app: App):
+    response = file_app.client.get("/", headers={"if-none-match": '"other"'})
+    assert response.status_code == 200
+    assert response.text == "hi files"
+
+
+@pytest.mark.parametrize(
+    "range_header, content_range, text",
+    [
+        ("bytes=0-1", "bytes 0-1/8", "hi"),
+        ("bytes=3-", "bytes 3-7/8", "files"),
+        ("bytes=-5", "bytes 3-7/8", "files"),
+        ("bytes=3-100", "bytes 3-7/8", "files"),
+    ],
+)
+def test_single_range(
+    file_app: App, range_header: str, content_range: str, text: str
+):
+    response = file_app.client.get("/", headers={"range": range_header})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == content_range
+    assert response.headers["content-length"] == str(len(text))
+    assert response.text == text
+
+
+def test_multiple_ranges(file_app: App):
+    response = file_app.client.get("/", headers={"range": "bytes=0-1,3-4"})
+    assert response.status_code == 206
+
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+
+    assert response.headers["content-length"] == str(len(response.content))
+    assert response.text == (
+        f"--{boundary}\r\n"
+        "content-type: text/plain\r\n"
+        "content-range: bytes 0-1/8\r\n\r\n"
+        "hi\r\n"
+        f"--{boundary}\r\n"
+        "content-type: text/plain\r\n"
+        "content-range: bytes 3-4/8\r\n\r\n"
+        "fi\r\n"
+        f"--{boundary}--\r\n"
+    )
+
+
+def test_if_range_not_satisfiable_then_416(file_app: App):
+    response = file_app.client.get("/", headers={"range": "bytes=100-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */8"
+
+
+@pytest.mark.parametrize("range_header", ["items=0-1", "bytes=2-1", "bytes=a-"])
+def test_if_range_is_invalid_then_whole_file_is_sent(
+    file_app: App, range_header: str
+):
+    response = file_app.client.get("/", headers={"range": range_header})
+    assert response.status_code == 200
+    assert response.text == "hi files"
+
+
+def test_if_range_does_not_match_then_whole_file_is_sent(file_app: App):
+    etag = file_app.client.get("/").headers["etag"]
+
+    response = file_app.client.get(
+        "/", headers={"range": "bytes=0-1", "if-range": etag}
+    )
+    assert response.status_code == 206
+
+    response = file_app.client.get(
+        "/", headers={"range": "bytes=0-1", "if-range": '"other"'}
+    )
+    assert response.status_code == 200
+    assert response.text == "hi files"
+
+
+def test_head_request_only_sends_headers(file_app: App):
+    response = file_app.client.head("/")
+    assert response.status_code == 200
+    assert response.headers["content-length"] == "8"
+    assert response.text == ""
+
+
+def test_stat_results_are_cached_briefly(txt: Path):
+    stat_result = stat_file(str(txt))
+    txt.unlink()
+    assert stat_file(str(txt)) is stat_result
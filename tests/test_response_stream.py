@@ -1,7 +1,9 @@
+import json
 from asyncio import sleep
 
 import pytest
 from bocadillo import App
+from bocadillo.media import stream_media
 
 
 def test_stream_response(app: App):
@@ -54,3 +56,63 @@ def test_stream_func_must_be_async_generator_function(app: App):
             @res.stream
             def foo():
                 yield "nope"
+
+
+def _rows(n: int):
+    return [{"id": i, "name": f"row {i}"} for i in range(n)]
+
+
+async def _arows(n: int):
+    for row in _rows(n):
+        yield row
+
+
+@pytest.mark.parametrize("n", [0, 1, 3])
+@pytest.mark.parametrize("make_values", [_rows, _arows])
+def test_media_stream_json_array(app: App, n: int, make_values):
+    @app.route("/")
+    async def index(req, res):
+        res.media_stream(make_values(n))
+
+    r = app.client.get("/")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == _rows(n)
+
+
+@pytest.mark.parametrize("n", [0, 1, 3])
+@pytest.mark.parametrize("make_values", [_rows, _arows])
+def test_media_stream_ndjson(app: App, n: int, make_values):
+    @app.route("/")
+    async def index(req, res):
+        res.media_stream(make_values(n), ndjson=True)
+
+    r = app.client.get("/")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in r.text.splitlines()] == _rows(n)
+
+
+def test_media_stream_uses_media_handler(app: App):
+    app.media_handlers["application/x-foo"] = lambda value: f'"foo{value}"'
+    app.media_type = "application/x-foo"
+
+    @app.route("/")
+    async def index(req, res):
+        res.media_stream(range(3))
+
+    r = app.client.get("/")
+    assert r.headers["content-type"] == "application/x-foo"
+    assert r.json() == ["foo0", "foo1", "foo2"]
+
+
+@pytest.mark.asyncio
+async def test_stream_media_buffers_values_into_chunks():
+    values = _rows(100)
+    handler = lambda value: json.dumps(value).encode()
+    chunks = [
+        chunk async for chunk in stream_media(values, handler, chunk_size=256)
+    ]
+    assert 1 < len(chunks) < len(values)
+    assert all(len(chunk) < 256 * 2 for chunk in chunks)
+    assert json.loads(b"".join(chunks)) == values
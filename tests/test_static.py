@@ -1,6 +1,10 @@
+import asyncio
+import gzip
+
 import pytest
 
 from bocadillo import App, static
+from bocadillo.staticfiles import compress_static, read_manifest
 
 FILE_DIR = "js"
 FILE_NAME = "foo.js"
@@ -75,3 +79,236 @@ def test_if_static_dir_does_not_exist_then_no_files_mounted():
     with pytest.warns(None) as record:
         App(static_dir="foo")
     assert len(record) == 0
+
+
+@pytest.fixture
+def asgi_static_app(tmpdir_factory) -> App:
+    static_dir = tmpdir_factory.mktemp("static")
+    _create_asset(static_dir)
+    return App(static_dir=str(static_dir), static_backend="asgi")
+
+
+def test_asgi_backend_serves_assets(asgi_static_app: App):
+    response = asgi_static_app.client.get(f"/static/{FILE_DIR}/{FILE_NAME}")
+    assert response.status_code == 200
+    assert response.text == FILE_CONTENTS
+    assert "javascript" in response.headers["content-type"]
+    assert response.headers["content-length"] == str(len(FILE_CONTENTS))
+    assert "etag" in response.headers
+    assert "last-modified" in response.headers
+
+
+def test_asgi_backend_if_asset_does_not_exist_then_404(asgi_static_app: App):
+    assert asgi_static_app.client.get("/static/foo.js").status_code == 404
+
+
+def test_asgi_backend_only_allows_get_and_head(asgi_static_app: App):
+    url = f"/static/{FILE_DIR}/{FILE_NAME}"
+    assert asgi_static_app.client.head(url).text == ""
+    response = asgi_static_app.client.post(url)
+    assert response.status_code == 405
+    assert response.headers["allow"] == "GET, HEAD"
+
+
+@pytest.mark.parametrize(
+    "header, value_from",
+    [("if-none-match", "etag"), ("if-modified-since", "last-modified")],
+)
+def test_asgi_backend_not_modified(
+    asgi_static_app: App, header: str, value_from: str
+):
+    url = f"/static/{FILE_DIR}/{FILE_NAME}"
+    response = asgi_static_app.client.get(url)
+    value = response.headers[value_from]
+
+    response = asgi_static_app.client.get(url, headers={header: value})
+    assert response.status_code == 304
+    assert response.text == ""
+
+
+def test_asgi_backend_weak_etag_is_not_modified(asgi_static_app: App):
+    url = f"/static/{FILE_DIR}/{FILE_NAME}"
+    etag = asgi_static_app.client.get(url).headers["etag"]
+    response = asgi_static_app.client.get(
+        url, headers={"if-none-match": f'"other", W/{etag}'}
+    )
+    assert response.status_code == 304
+
+
+def test_asgi_backend_streams_large_files(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    contents = "x" * 100
+    static_dir.join("big.txt").write(contents)
+
+    app = App(static_dir=None)
+    app.mount(
+        "static",
+        static(
+            str(static_dir),
+            backend="asgi",
+            cache_max_file_size=10,
+            chunk_size=8,
+        ),
+    )
+
+    response = app.client.get("/static/big.txt")
+    assert response.status_code == 200
+    assert response.text == contents
+
+
+@pytest.mark.asyncio
+async def test_asgi_backend_uses_zerocopy_send_if_supported(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    static_dir.join("big.txt").write("x" * 100)
+    app = static(str(static_dir), backend="asgi", cache_max_file_size=10)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/big.txt",
+        "headers": [],
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    messages = []
+
+    async def receive():
+        pass
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            message = {**message, "file": message["file"].read()}
+        messages.append(message)
+
+    await app(scope)(receive, send)
+
+    assert messages[0]["status"] == 200
+    assert messages[1] == {
+        "type": "http.response.zerocopysend",
+        "file": b"x" * 100,
+        "count": 100,
+    }
+
+
+@pytest.mark.asyncio
+async def test_asgi_backend_cache_size_with_concurrent_requests(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    _create_asset(static_dir)
+    app = static(str(static_dir), backend="asgi")
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": f"/{FILE_DIR}/{FILE_NAME}",
+        "headers": [],
+    }
+    bodies = []
+
+    async def receive():
+        pass
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            bodies.append(message["body"])
+
+    await asyncio.gather(*(app(scope)(receive, send) for _ in range(5)))
+
+    assert bodies == [FILE_CONTENTS.encode()] * 5
+    assert len(app._cache) == 1
+    assert app._cache_bytes == len(FILE_CONTENTS)
+
+
+def test_asgi_backend_caches_small_files(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    asset = _create_asset(static_dir)
+
+    app = App(static_dir=None)
+    app.mount("static", static(str(static_dir), backend="asgi"))
+    url = f"/static/{FILE_DIR}/{FILE_NAME}"
+
+    assert app.client.get(url).text == FILE_CONTENTS
+    asset.remove()
+    assert app.client.get(url).text == FILE_CONTENTS
+
+
+def _compressible_asset(static_dir):
+    asset = static_dir.join("app.js")
+    asset.write(FILE_CONTENTS * 100)
+    return asset
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("deflate", None),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("GZIP", "gzip"),
+        ("gzip;q=0, *", None),
+        ("*, Gzip; Q=0", None),
+    ],
+)
+def test_asgi_backend_serves_gzip_sidecar(
+    tmpdir_factory, accept_encoding, expected
+):
+    static_dir = tmpdir_factory.mktemp("static")
+    _compressible_asset(static_dir)
+    compress_static(str(static_dir), encodings=["gzip"], hash_names=False)
+
+    app = App(static_dir=str(static_dir), static_backend="asgi")
+
+    response = app.client.get(
+        "/static/app.js", headers={"accept-encoding": accept_encoding}
+    )
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == expected
+    assert response.headers["vary"] == "Accept-Encoding"
+    # NOTE: requests decodes gzip-encoded responses.
+    assert response.text == FILE_CONTENTS * 100
+
+
+def test_compress_static_writes_hashed_files_and_manifest(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    _compressible_asset(static_dir)
+
+    manifest = compress_static(str(static_dir), encodings=["gzip"])
+
+    hashed = manifest["app.js"]
+    assert hashed.startswith("app.") and hashed.endswith(".js")
+    assert static_dir.join(hashed).read() == FILE_CONTENTS * 100
+    assert static_dir.join(hashed + ".gz").exists()
+    gzipped = static_dir.join("app.js.gz").read_binary()
+    assert gzip.decompress(gzipped) == (FILE_CONTENTS * 100).encode()
+    # Output is reproducible.
+    assert static_dir.join(hashed + ".gz").read_binary() == gzipped
+    assert read_manifest(str(static_dir)) == manifest
+
+    # Running the build step again is idempotent.
+    assert compress_static(str(static_dir), encodings=["gzip"]) == manifest
+
+
+def test_compress_static_skips_small_files(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    _create_asset(static_dir)
+    compress_static(str(static_dir), encodings=["gzip"], hash_names=False)
+    assert not static_dir.join(FILE_DIR, FILE_NAME + ".gz").exists()
+    assert not static_dir.join("staticfiles.json").exists()
+
+
+def test_asgi_backend_serves_hashed_files_as_immutable(tmpdir_factory):
+    static_dir = tmpdir_factory.mktemp("static")
+    _compressible_asset(static_dir)
+    manifest = compress_static(str(static_dir), encodings=["gzip"])
+
+    static_app = static(str(static_dir), backend="asgi")
+    assert static_app.manifest == manifest
+
+    app = App(static_dir=None)
+    app.mount("static", static_app)
+
+    response = app.client.get(f"/static/{manifest['app.js']}")
+    assert response.headers["cache-control"] == (
+        "public, max-age=31536000, immutable"
+    )
+    response = app.client.get("/static/app.js")
+    assert "cache-control" not in response.headers